@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+
+#----------------------------------------
+# Import Time Benchmark
+#----------------------------------------
+
+# Modules loaded when the app and its pages start
+MODULES = [
+    'src.download_data',
+    'src.preprocess',
+    'src.predict',
+    'src.visualize',
+    'src.file_handling',
+    'src.model_registry',
+    'src.forecast_cache',
+    'src.inference',
+    'src.storage',
+]
+
+# Dependencies that must not be imported just by importing the modules above
+HEAVY_DEPENDENCIES = ['tensorflow', 'yfinance', 'matplotlib', 'sklearn', 'plotly']
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import(module, repeat=3):
+    """
+    Import `module` in fresh interpreters with `-X importtime`.
+    Returns the best cumulative import time (ms), the heaviest packages it
+    pulled in, and which heavy dependencies were loaded.
+    """
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY_DEPENDENCIES!r} if m in sys.modules))"
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+        )
+        # Lines look like "import time:  self [us] | cumulative | package", nesting is indentation
+        timings = {}
+        for line in proc.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if not name[1:].startswith(' '):
+                timings[name.strip()] = int(cumulative) / 1000.0
+
+        total_ms = timings.get(module, 0.0)
+        if best is None or total_ms < best['ms']:
+            heaviest = sorted(((n, t) for n, t in timings.items() if n != module), key=lambda x: -x[1])[:5]
+            best = {
+                'module': module,
+                'ms': total_ms,
+                'heaviest': heaviest,
+                'heavy_dependencies': [m for m in proc.stdout.strip().split(',') if m],
+            }
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure per-module import cost in fresh interpreters")
+    parser.add_argument('modules', nargs='*', default=MODULES)
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per module; the fastest is reported")
+    parser.add_argument('--output', default=None, help="Write the results to this JSON file")
+    parser.add_argument('--baseline', default=None, help="JSON from a previous run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Relative slowdown flagged as a regression")
+    args = parser.parse_args(argv)
+
+    results = [measure_import(module, args.repeat) for module in args.modules]
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {r['module']: r for r in json.load(f)}
+
+    regressions = []
+    for r in results:
+        line = f"{r['module']:<24} {r['ms']:8.1f} ms"
+        old = baseline.get(r['module'])
+        if old is not None and old['ms'] > 0:
+            change = (r['ms'] - old['ms']) / old['ms']
+            line += f"  ({change:+.0%} vs baseline)"
+            if change > args.threshold:
+                regressions.append(r['module'])
+        if r['heavy_dependencies']:
+            line += f"  ⚠️ loads {', '.join(r['heavy_dependencies'])}"
+        print(line)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results saved to {args.output}")
+
+    if regressions:
+        print(f"❌ Import time regressed for: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
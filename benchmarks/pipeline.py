@@ -0,0 +1,190 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+
+#----------------------------------------
+# Pipeline Benchmark
+#----------------------------------------
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TICKERS = ['AAPL', 'GOOGL', 'MSFT', 'AMZN', 'META', 'TSLA']
+
+# Committed fixtures copied into the scratch directory the benchmark runs in
+FIXTURES = ['historical', 'data', 'model', 'style.css']
+
+
+def time_call(fn, repeat):
+    """Run fn `repeat` times; returns (timings in ms, last result)"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return timings, result
+
+
+def summarize(timings):
+    ordered = sorted(timings)
+    return {
+        'min_ms': ordered[0],
+        'median_ms': statistics.median(ordered),
+        'p95_ms': ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+        'runs': len(ordered),
+    }
+
+
+def benchmark_ticker(ticker, repeat):
+    """Time every stage of the prediction pipeline for one ticker; returns {stage: summary}"""
+    import pandas as pd
+
+    from src.download_data import load_historical_data, should_download
+    from src.frame_cache import invalidate_ticker
+    from src.model_registry import get_registry, model_path_for
+    from src.predict import predict_next_days_single_feature
+    from src.preprocess import prepare_data_for_single_feature_model, prepare_inference_window, preprocess_data
+    from src.visualize import calculate_stats, create_prediction_chart, create_prediction_table, create_price_chart
+
+    stages = {}
+
+    def run(stage, fn, n=repeat):
+        timings, result = time_call(fn, n)
+        stages[stage] = summarize(timings)
+        return result
+
+    run('should_download', lambda: should_download(ticker))
+    run('preprocess_data', lambda: preprocess_data(os.path.join('data', f'{ticker}_recent.csv'), ticker))
+
+    def load_cold():
+        invalidate_ticker(ticker)
+        return load_historical_data(ticker)
+
+    run('load_historical_data_cold', load_cold)
+    df = run('load_historical_data', lambda: load_historical_data(ticker))
+
+    run('prepare_data_for_single_feature_model', lambda: prepare_data_for_single_feature_model(df))
+    x_input, scaler = run('prepare_inference_window', lambda: prepare_inference_window(df, ticker))
+
+    registry = get_registry()
+
+    def load_cold_model():
+        registry.invalidate(ticker)
+        return registry.get(ticker)
+
+    # Reloading Keras models is slow, so the cold load is measured fewer times
+    run('load_model_cold', load_cold_model, n=max(1, min(repeat, 3)))
+    model = run('load_model', lambda: registry.get(ticker))
+    if model is None:
+        print(f"⚠️ No model at {model_path_for(ticker)}, skipping inference stages")
+        return stages
+
+    # First call compiles the forecast graph; time it separately from steady state
+    run('predict_next_days_first_call', lambda: predict_next_days_single_feature(model, x_input, scaler), n=1)
+    predicted = run('predict_next_days_single_feature', lambda: predict_next_days_single_feature(model, x_input, scaler))
+
+    last_month = df[df['Date'] >= df['Date'].iloc[-1] - pd.DateOffset(months=1)]
+    run('create_prediction_chart', lambda: create_prediction_chart(df, predicted))
+    run('create_prediction_table', lambda: create_prediction_table(predicted))
+    run('create_price_chart', lambda: create_price_chart(last_month.copy()))
+    run('calculate_stats', lambda: calculate_stats(last_month))
+    return stages
+
+
+#----------------------------------------
+# Compare With Baseline
+#----------------------------------------
+
+def compare(results, baseline, threshold):
+    """List of (stage, ticker, old_ms, new_ms) whose median got slower by more than `threshold`"""
+    regressions = []
+    for stage, per_ticker in results['stages'].items():
+        for ticker, summary in per_ticker.items():
+            old = baseline.get('stages', {}).get(stage, {}).get(ticker)
+            if old is None or old['median_ms'] <= 0:
+                continue
+            if summary['median_ms'] > old['median_ms'] * (1 + threshold):
+                regressions.append((stage, ticker, old['median_ms'], summary['median_ms']))
+    return regressions
+
+
+def print_table(results):
+    tickers = results['tickers']
+    print(f"\n{'stage (median ms)':<38}" + ''.join(f"{t:>10}" for t in tickers))
+    for stage, per_ticker in results['stages'].items():
+        cells = ''.join(f"{per_ticker[t]['median_ms']:>10.2f}" if t in per_ticker else f"{'-':>10}" for t in tickers)
+        print(f"{stage:<38}{cells}")
+
+
+#----------------------------------------
+# Command Line
+#----------------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark each stage of the prediction pipeline offline")
+    parser.add_argument('tickers', nargs='*', default=TICKERS)
+    parser.add_argument('--repeat', type=int, default=10, help="Runs per stage")
+    parser.add_argument('--output', default=None, help="Write the results to this JSON file")
+    parser.add_argument('--baseline', default=None, help="JSON from a previous run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Relative slowdown flagged as a regression")
+    args = parser.parse_args(argv)
+
+    # Work on a scratch copy of the fixtures, since preprocessing writes files
+    workdir = tempfile.mkdtemp(prefix='stock-bench-')
+    for name in FIXTURES:
+        src = os.path.join(REPO_ROOT, name)
+        dst = os.path.join(workdir, name)
+        if os.path.isdir(src):
+            shutil.copytree(src, dst)
+        elif os.path.exists(src):
+            shutil.copy2(src, dst)
+
+    sys.path.insert(0, REPO_ROOT)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        stages = {}
+        for ticker in args.tickers:
+            print(f"⏱️ Benchmarking {ticker}...")
+            for stage, summary in benchmark_ticker(ticker, args.repeat).items():
+                stages.setdefault(stage, {})[ticker] = summary
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'tickers': list(args.tickers),
+        'stages': stages,
+    }
+    print_table(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for stage, ticker, old_ms, new_ms in regressions:
+            print(f"❌ {stage} [{ticker}]: {old_ms:.2f} ms -> {new_ms:.2f} ms")
+        if regressions:
+            return 1
+        print("✅ No regressions against the baseline")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
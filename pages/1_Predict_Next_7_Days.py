@@ -3,13 +3,12 @@ from src.preprocess import *
 from src.predict import *
 from src.visualize import *
 from src.file_handling import *
+from src.forecast_cache import cached_forecast
+from src.inference import INFERENCE_BACKEND
+from src.instrumentation import StageProgress, on_span_end, span
 
 import streamlit as st
-import pandas as pd
 import numpy as np
-import time
-
-from tensorflow.keras.models import load_model
 
 st.set_page_config(page_title="Stock Prediction", layout="wide")
 
@@ -29,71 +28,47 @@ if ticker:
     
     prediction_placeholder = st.empty()
     
+    # Monte-Carlo dropout needs the Keras graph, so the band is only offered when TensorFlow is already in use
+    show_band = INFERENCE_BACKEND in ('keras', 'ensemble') and st.checkbox(
+        f"Show uncertainty band ({MC_SAMPLES} Monte-Carlo dropout samples)", value=False)
+    
     if st.button("Run Prediction"):
-        with st.spinner("Running prediction pipeline..."):
-            # Show a progress bar
-            progress_bar = st.progress(0)
-            progress_bar.progress(10)
-            time.sleep(0.5)
-            
+        # The progress bar advances as each pipeline stage finishes
+        progress_bar = st.progress(0)
+        progress = StageProgress(progress_bar.progress)
+
+        with st.spinner("Running prediction pipeline..."), on_span_end(progress):
             if should_download(ticker):
-                # Delete Existing Files 
-                cleanup_old_ticker_files(ticker)
-                # Download and preprocess data
-                data_path = download_stock_data(ticker)
-                progress_bar.progress(30)
-                time.sleep(0.5)
-            
-                recent_path = preprocess_data(data_path, ticker)
-                progress_bar.progress(50)
-                time.sleep(0.5)
+                # Fetch only the bars after the last stored date
+                sync_ticker(ticker)
             else:
                 print("⏳ Skipping download.")
-                recent_path = f"data/{ticker}_clean.csv"
-               
-            recent_df = pd.read_csv(recent_path)
-            progress_bar.progress(60)
-            
-            # Fix columns
-            if 'Date' not in recent_df.columns:
-                recent_df.reset_index(inplace=True)
-                recent_df.rename(columns={'index': 'Date'}, inplace=True)
-            recent_df['Date'] = pd.to_datetime(recent_df['Date'])
-            
-            historical_df = load_historical_data(ticker)
-            historical_df['Date'] = pd.to_datetime(historical_df['Date'])
-            progress_bar.progress(70)
-            
-            all_data = historical_df
-            
-            # Prepare data for model
-            x_input, scaler, _ = prepare_data_for_single_feature_model(all_data)
-            progress_bar.progress(80)
-            time.sleep(0.5)
+                progress.skip('download', 'clean')
+
+            # Historical + recent prices, read from the price store
+            all_data = load_historical_data(ticker)
             
             model_path = f"model/{ticker}_model.h5"
             
             # Check if model exists and make prediction
             if os.path.exists(model_path):
-                model = load_model(model_path)
-                predicted_prices = predict_next_days_single_feature(model, x_input, scaler)
-                progress_bar.progress(100)
-                time.sleep(0.5)
-                
-                # Remove progress bar
-                progress_bar.empty()
+                # Reuses the stored forecast while the data and model are unchanged
+                forecast = cached_forecast(ticker, all_data, mc_samples=MC_SAMPLES if show_band else 0)
+                # On a cache hit these stages never ran
+                progress.skip('scale', 'model_load', 'inference')
                 
                 # Display results if prediction was successful
-                if predicted_prices is not None:
-                    last_price = all_data['Close'].iloc[-1]
+                if forecast is not None:
+                    predicted_prices = np.array(forecast['predicted_prices'])
+                    last_price = forecast['last_price']
                     
                     # Display the prediction results in the placeholder
-                    with prediction_placeholder.container():
+                    with span('render', ticker), prediction_placeholder.container():
                         # Create columns for the layout
                         rec_col, chart_col = st.columns([1, 2])
                         
                         # Get recommendation
-                        rec, reason, bg_color, text_color = get_recommendation(predicted_prices, last_price)
+                        rec, reason, bg_color, text_color = forecast['recommendation']
                         
                         # Show recommendation in the left column
                         with rec_col:
@@ -116,7 +91,7 @@ if ticker:
                         # Show chart in the right column
                         with chart_col:
                             st.markdown('<div class="card">', unsafe_allow_html=True)
-                            fig = create_prediction_chart(all_data, predicted_prices)
+                            fig = create_prediction_chart(all_data, predicted_prices, forecast.get('quantiles'))
                             st.plotly_chart(fig, use_container_width=True)
                             st.markdown('</div>', unsafe_allow_html=True)
                         
@@ -136,14 +111,28 @@ if ticker:
                         max_price = max(predicted_prices)
                         volatility = np.std(predicted_prices) / np.mean(predicted_prices) * 100
                         
+                        # Spread of the Monte-Carlo dropout forecasts on the last day, when available
+                        band_note = ""
+                        quantiles = forecast.get('quantiles')
+                        if quantiles:
+                            levels = sorted(quantiles, key=float)
+                            low, median, high = quantiles[levels[0]][-1], quantiles[levels[len(levels) // 2]][-1], quantiles[levels[-1]][-1]
+                            volatility = (high - low) / 2 / median * 100
+                            band_note = (f"- {float(levels[-1]) - float(levels[0]):.0%} interval for day 7 "
+                                         f"({forecast['mc_samples']} dropout samples): ${low:.2f} to ${high:.2f}")
+                        
                         st.markdown(f"""
                         - The model predicts a {'positive' if predicted_prices[-1] > last_price else 'negative'} trend for {ticker} over the next 7 trading days.
                         - Predicted price range: ${min_price:.2f} to ${max_price:.2f}
                         - Expected volatility: {volatility:.2f}%
+                        {band_note}
                         
                         **Disclaimer:** These predictions are based on historical patterns and should not be the sole basis for investment decisions.
                         """)
                         st.markdown('</div>', unsafe_allow_html=True)
+
+                # Remove progress bar
+                progress_bar.empty()
             else:
                 st.error(f"Model not found for {ticker}. Please try a different stock.")
 else:
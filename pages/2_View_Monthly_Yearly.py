@@ -1,5 +1,6 @@
 import streamlit as st
-from src.download_data import load_historical_data
+from src.aggregates import get_period_index
+from src.chart_data import chart_frame
 from src.visualize import *
 
 
@@ -25,23 +26,33 @@ if ticker:
     </div>
     """, unsafe_allow_html=True)
     
-    # Load historical data
-    df = load_historical_data(ticker)
-    if df is not None and not df.empty:
-        df['Date'] = pd.to_datetime(df['Date'])
-        df['Year'] = df['Date'].dt.year
-        df['Month'] = df['Date'].dt.month
-        
+    # Load the period index (built once per ticker, extended when new bars land)
+    index = get_period_index(ticker)
+    if index is not None:
+        view = st.radio("View", ["Monthly", "Yearly", "All History"], horizontal=True)
+
         # Filter options
         col1, col2 = st.columns(2)
-        with col1:
-            year = st.selectbox("Select Year", sorted(df['Year'].unique(), reverse=True))
-        with col2:
-            month = st.selectbox("Select Month", sorted(df[df['Year'] == year]['Month'].unique()), 
-                               format_func=get_month_name)
-        
-        # Filter the data
-        filtered_df = df[(df['Year'] == year) & (df['Month'] == month)]
+        if view != "All History":
+            with col1:
+                year = st.selectbox("Select Year", index.years())
+        if view == "All History":
+            # Downsampled once per ticker and resolution, so the payload stays bounded
+            filtered_df = chart_frame(ticker, 'all')
+            stats = index.history_stats()
+            period_label = f"{index.years()[-1]}-{index.years()[0]}"
+        elif view == "Monthly":
+            with col2:
+                month = st.selectbox("Select Month", index.months(year), format_func=get_month_name)
+
+            # Rows of the period are a slice of the history; statistics are precomputed
+            filtered_df = index.month_rows(year, month)
+            stats = index.month_stats(year, month)
+            period_label = f"{get_month_name(month)} {year}"
+        else:
+            filtered_df = index.year_rows(year)
+            stats = index.year_stats(year)
+            period_label = str(year)
         
         if not filtered_df.empty:
             # First show the chart
@@ -50,9 +61,6 @@ if ticker:
             st.plotly_chart(fig, use_container_width=True)
             st.markdown('</div>', unsafe_allow_html=True)
             
-            # Calculate statistics
-            stats = calculate_stats(filtered_df)
-            
             # Display statistics cards
             st.markdown('<div class="card">', unsafe_allow_html=True)
             st.subheader("📊 Key Statistics")
@@ -101,15 +109,25 @@ if ticker:
                 """, unsafe_allow_html=True)
             st.markdown('</div>', unsafe_allow_html=True)
 
-            # Show the table of filtered data
+            # Show the table of filtered data (month by month in the yearly view, year by year for all history)
             st.markdown('<div class="card">', unsafe_allow_html=True)
-            st.subheader(f"📅 Stock Data for {get_month_name(month)} {year}")
-            display_df = filtered_df[['Date', 'Open', 'High', 'Low', 'Close', 'Volume']].copy()
-            display_df['Date'] = display_df['Date'].dt.strftime('%Y-%m-%d')
+            st.subheader(f"📅 Stock Data for {period_label}")
+            summary_columns = ['first_price', 'last_price', 'lowest_price', 'highest_price',
+                               'avg_price', 'price_change_pct', 'volatility']
+            if view == "Monthly":
+                display_df = filtered_df[['Date', 'Open', 'High', 'Low', 'Close', 'Volume']].copy()
+                display_df['Date'] = display_df['Date'].dt.strftime('%Y-%m-%d')
+            elif view == "Yearly":
+                display_df = index.monthly.loc[year, summary_columns].copy()
+                display_df.index = [get_month_name(m) for m in display_df.index]
+            else:
+                display_df = index.yearly[summary_columns].iloc[::-1].copy()
+            if view != "Monthly":
+                display_df.columns = ['Open', 'Close', 'Low', 'High', 'Average', 'Change %', 'Volatility %']
             st.dataframe(display_df, use_container_width=True)
             st.markdown('</div>', unsafe_allow_html=True)
         else:
-            st.error("No data available for the selected month and year.")
+            st.error("No data available for the selected period.")
     else:
         st.error("Historical data could not be loaded or is empty.")
 else:
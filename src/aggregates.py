@@ -0,0 +1,164 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+#---------------------------------
+# Period Statistics
+#---------------------------------
+
+STAT_COLUMNS = ['first_price', 'last_price', 'highest_price', 'lowest_price', 'avg_price',
+                'price_change', 'price_change_pct', 'volatility']
+
+
+def _period_stats(df, keys, offset=0):
+    """
+    The calculate_stats figures of every run of equal `keys` (the frame is
+    sorted by date, so each month or year is one run), computed for all
+    periods at once with reduceat. Returns one row per period, with its
+    [start, stop) row range shifted by `offset`.
+    """
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    stops = np.r_[starts[1:], len(keys)]
+    counts = stops - starts
+
+    open_ = df['Open'].to_numpy(dtype=np.float64)
+    close = df['Close'].to_numpy(dtype=np.float64)
+    first = open_[starts]
+    last = close[stops - 1]
+
+    # Daily returns inside each period; the first day of a period has none
+    returns = np.zeros(len(close))
+    returns[1:] = close[1:] / close[:-1] - 1.0
+    returns[starts] = 0.0
+    n_returns = counts - 1
+    sums = np.add.reduceat(returns, starts)
+    squares = np.add.reduceat(returns ** 2, starts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = (squares - sums ** 2 / n_returns) / (n_returns - 1)
+    volatility = np.where(n_returns > 1, np.sqrt(np.maximum(variance, 0.0)) * 100, np.nan)
+
+    return pd.DataFrame({
+        'first_price': first,
+        'last_price': last,
+        'highest_price': np.maximum.reduceat(df['High'].to_numpy(dtype=np.float64), starts),
+        'lowest_price': np.minimum.reduceat(df['Low'].to_numpy(dtype=np.float64), starts),
+        'avg_price': np.add.reduceat(close, starts) / counts,
+        'price_change': last - first,
+        'price_change_pct': (last - first) / first * 100,
+        'volatility': volatility,
+        'start': starts + offset,
+        'stop': stops + offset,
+    })
+
+
+class PeriodIndex:
+    """
+    Per-ticker index of the merged price frame: (year, month) and year ->
+    row slice, with the monthly and yearly statistics materialised, so a
+    period's rows and figures are looked up without scanning the history.
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.monthly, self.yearly = self._build(frame)
+        self._history = None
+
+    @staticmethod
+    def _build(frame, offset=0):
+        dates = frame['Date'].to_numpy(dtype='datetime64[M]')
+        month_keys = dates.astype(np.int64)   # months since 1970-01
+        years = month_keys // 12 + 1970
+
+        monthly = _period_stats(frame, month_keys, offset)
+        month_starts = monthly['start'].to_numpy() - offset
+        monthly.index = pd.MultiIndex.from_arrays([years[month_starts], month_keys[month_starts] % 12 + 1],
+                                                  names=['year', 'month'])
+
+        yearly = _period_stats(frame, years, offset)
+        yearly.index = pd.Index(years[yearly['start'].to_numpy() - offset], name='year')
+        return monthly, yearly
+
+    def extend(self, frame):
+        """
+        Index for `frame`, which holds this frame's rows plus appended bars.
+        Only the last indexed year onwards is recomputed.
+        """
+        if not len(self.yearly):
+            return PeriodIndex(frame)
+        start = int(self.yearly['start'].iloc[-1])
+        monthly, yearly = self._build(frame.iloc[start:], offset=start)
+
+        index = PeriodIndex.__new__(PeriodIndex)
+        index.frame = frame
+        last_year = self.yearly.index[-1]
+        index.monthly = pd.concat([self.monthly[self.monthly.index.get_level_values('year') < last_year], monthly])
+        index.yearly = pd.concat([self.yearly.iloc[:-1], yearly])
+        index._history = None
+        return index
+
+    def years(self):
+        return list(self.yearly.index[::-1])
+
+    def months(self, year):
+        return list(self.monthly.loc[year].index)
+
+    def month_rows(self, year, month):
+        row = self.monthly.loc[(year, month)]
+        return self.frame.iloc[int(row['start']):int(row['stop'])]
+
+    def year_rows(self, year):
+        row = self.yearly.loc[year]
+        return self.frame.iloc[int(row['start']):int(row['stop'])]
+
+    def month_stats(self, year, month):
+        return self.monthly.loc[(year, month), STAT_COLUMNS].to_dict()
+
+    def year_stats(self, year):
+        return self.yearly.loc[year, STAT_COLUMNS].to_dict()
+
+    def history_stats(self):
+        """Statistics of the whole history, computed on first use"""
+        if self._history is None:
+            self._history = _period_stats(self.frame, np.zeros(len(self.frame), dtype=np.int64)).iloc[0]
+        return self._history[STAT_COLUMNS].to_dict()
+
+
+#---------------------------------
+# Period Index Cache
+#---------------------------------
+
+# ticker -> dict(index, rows, signature)
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_period_index(ticker):
+    """
+    PeriodIndex over the ticker's feature frame (prices plus the indicator
+    columns from src.features), or None. Built once per ticker and reused
+    while the source files are unchanged; extended when bars are appended to
+    the store and rebuilt when an earlier bar was corrected.
+    """
+    from src.features import bars_unchanged, get_feature_frame
+    from src.frame_cache import source_signature
+
+    signature = source_signature(ticker)
+    with _indexes_lock:
+        entry = _indexes.get(ticker)
+    if entry is not None and entry['signature'] == signature:
+        return entry['index']
+
+    frame = get_feature_frame(ticker)
+    if frame is None or frame.empty:
+        return None
+
+    rows = len(frame)
+    if entry is not None and rows >= entry['rows'] and bars_unchanged(frame, entry['index'].frame, entry['rows']):
+        index = entry['index'].extend(frame) if rows > entry['rows'] else entry['index']
+    else:
+        index = PeriodIndex(frame)
+    with _indexes_lock:
+        _indexes[ticker] = {'index': index, 'rows': rows, 'signature': signature}
+    return index
@@ -0,0 +1,210 @@
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.inference import INFERENCE_BACKEND
+from src.storage import TICKERS
+from src.window_dataset import WindowDataset, cached_series
+from src.workers import pinned_process_pool
+
+
+#----------------------------------------
+# Walk-Forward Forecasts
+#----------------------------------------
+
+def walk_forward_forecasts(instance, dataset, batch_size=512):
+    """
+    Forecast `dataset.horizon` days ahead from every sample of a WindowDataset,
+    the way predict_next_days_single_feature does for the latest window.
+    Windows are gathered and forecast `batch_size` at a time.
+    Returns scaled forecasts of shape [samples, horizon].
+    """
+    forecasts = np.empty((len(dataset), dataset.horizon), dtype=np.float32)
+    for start in range(0, len(dataset), batch_size):
+        X, _ = dataset.take(np.arange(start, min(start + batch_size, len(dataset))))
+        forecasts[start:start + len(X)] = instance.forecast_scaled(X, days=dataset.horizon)
+    return forecasts
+
+
+#----------------------------------------
+# Scoring
+#----------------------------------------
+
+def score_forecasts(predicted, realised):
+    """Per-horizon MAE, RMSE and MAPE (in price units) for [origins, days] arrays"""
+    errors = predicted - realised
+    return {
+        'mae': np.abs(errors).mean(axis=0).tolist(),
+        'rmse': np.sqrt((errors ** 2).mean(axis=0)).tolist(),
+        'mape': (np.abs(errors) / np.abs(realised) * 100).mean(axis=0).tolist(),
+    }
+
+
+def score_signals(predicted, realised, last_prices):
+    """
+    Score the get_recommendation signal made at every origin against the
+    realised return at the end of the horizon. BUY is a hit when the price
+    rose, SELL when it fell and HOLD when it moved less than 2%.
+    """
+    from src.predict import get_recommendation
+
+    signals = np.array([get_recommendation(p, last)[0] for p, last in zip(predicted, last_prices)])
+    realised_return = (realised[:, -1] - last_prices) / last_prices * 100
+
+    hits = np.where(signals == 'BUY', realised_return > 0,
+                    np.where(signals == 'SELL', realised_return < 0, np.abs(realised_return) <= 2))
+    position = np.where(signals == 'BUY', 1.0, np.where(signals == 'SELL', -1.0, 0.0))
+
+    summary = {}
+    for signal in ('BUY', 'SELL', 'HOLD'):
+        mask = signals == signal
+        summary[signal] = {
+            'count': int(mask.sum()),
+            'hit_rate': float(hits[mask].mean()) if mask.any() else None,
+            'mean_return_pct': float(realised_return[mask].mean()) if mask.any() else None,
+        }
+    summary['hit_rate'] = float(hits.mean()) if len(hits) else None
+    # Mean return of going long on BUY and short on SELL for one horizon
+    summary['strategy_return_pct'] = float((position * realised_return).mean()) if len(hits) else None
+    return summary
+
+
+#----------------------------------------
+# Backtest One Ticker
+#----------------------------------------
+
+def backtest_ticker(ticker, days=7, time_step=60, step=1, start_date=None, backend=None, batch_size=512):
+    """Walk-forward backtest of one ticker over its full merged history; returns a metrics dict"""
+    from src.download_data import load_historical_data
+    from src.inference import get_backend
+    from src.preprocess import prepare_inference_window
+
+    start = time.perf_counter()
+    df = load_historical_data(ticker)
+    if df is None:
+        return None
+    _, scaler = prepare_inference_window(df, ticker, time_step=time_step)
+    instance = get_backend(ticker, backend)
+    if scaler is None or instance is None:
+        return None
+
+    closes = df['Close'].to_numpy(dtype=np.float64)
+    # The scaled history is stored once and reused until the data or scaler changes
+    meta = {
+        'rows': len(df),
+        'last_date': str(df['Date'].iloc[-1].date()),
+        'scaler': [float(scaler.data_min_[0]), float(scaler.data_max_[0])],
+    }
+    scaled = cached_series(ticker, 'history', meta, lambda: scaler.transform(closes.reshape(-1, 1)))
+
+    # Origin t forecasts from the window ending at t, i.e. targets start at t + 1
+    first_target = None
+    if start_date is not None:
+        first_target = int(np.searchsorted(df['Date'].to_numpy(), np.datetime64(start_date))) + 1
+
+    dataset = WindowDataset({ticker: scaled}, time_step, horizon=days, ranges={ticker: (first_target, None)}, step=step)
+    if not len(dataset):
+        print(f"⚠️ No origins with a full {days}-day horizon for {ticker}")
+        return None
+    forecasts = walk_forward_forecasts(instance, dataset, batch_size)
+
+    origins = dataset.targets() - 1
+    predicted = scaler.inverse_transform(forecasts.reshape(-1, 1)).reshape(len(origins), days)
+    realised = sliding_window_view(closes, days)[origins + 1]
+    last_prices = closes[origins]
+
+    # Direction of the horizon-end move, predicted vs realised
+    direction = np.sign(predicted[:, -1] - last_prices) == np.sign(realised[:, -1] - last_prices)
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ {ticker}: {len(origins)} origins backtested in {elapsed:.1f}s")
+    return {
+        'origins': int(len(origins)),
+        'first_origin': str(df['Date'].iloc[origins[0]].date()),
+        'last_origin': str(df['Date'].iloc[origins[-1]].date()),
+        'backend': getattr(instance, 'name', backend),
+        'days': days,
+        **score_forecasts(predicted, realised),
+        'directional_accuracy': float(direction.mean()),
+        'signals': score_signals(predicted, realised, last_prices),
+        'elapsed_s': elapsed,
+    }
+
+
+#----------------------------------------
+# Backtest Many Tickers
+#----------------------------------------
+
+def _backtest_task(kwargs):
+    return backtest_ticker(**kwargs)
+
+
+def backtest_tickers(tickers=None, workers=1, **backtest_kwargs):
+    """Backtest several tickers, in parallel processes when workers > 1. Returns {ticker: metrics}."""
+    tickers = list(tickers or TICKERS)
+    tasks = [dict(ticker=ticker, **backtest_kwargs) for ticker in tickers]
+
+    if workers <= 1:
+        return {task['ticker']: backtest_ticker(**task) for task in tasks}
+
+    # Each backtest process gets its own CPUs; TensorFlow is only configured for the backends that use it
+    uses_tensorflow = (backtest_kwargs.get('backend') or INFERENCE_BACKEND) in ('keras', 'ensemble')
+    with pinned_process_pool(workers, configure_tensorflow=uses_tensorflow) as pool:
+        return dict(zip(tickers, pool.map(_backtest_task, tasks)))
+
+
+def print_summary(results):
+    print("\n| Ticker | Origins | MAE day 1 | MAE day 7 | MAPE day 7 | Direction | Signal hits | Strategy |")
+    print("| ------ | ------- | --------- | --------- | ---------- | --------- | ----------- | -------- |")
+    for ticker, r in results.items():
+        if r is None:
+            print(f"| {ticker} | failed | | | | | | |")
+            continue
+        signals = r['signals']
+        print(f"| {ticker} | {r['origins']} | {r['mae'][0]:.2f} | {r['mae'][-1]:.2f} | {r['mape'][-1]:.2f}% "
+              f"| {r['directional_accuracy']:.1%} | {signals['hit_rate']:.1%} | {signals['strategy_return_pct']:+.2f}% |")
+
+
+#----------------------------------------
+# Command Line
+#----------------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the forecasts and recommendations")
+    parser.add_argument('tickers', nargs='*', default=TICKERS, help="Tickers to backtest (default: all)")
+    parser.add_argument('--workers', type=int, default=1, help="Tickers backtested in parallel processes")
+    parser.add_argument('--days', type=int, default=7, help="Forecast horizon")
+    parser.add_argument('--step', type=int, default=1, help="Trading days between origins")
+    parser.add_argument('--start', default=None, help="First origin date (e.g. the end of the training data)")
+    parser.add_argument('--batch-size', type=int, default=512, help="Origin windows per forecast call")
+    parser.add_argument('--backend', default=None, help="keras, tflite, numpy or ensemble (default: STOCK_INFERENCE_BACKEND)")
+    parser.add_argument('--output', default=None, help="Write the metrics to this JSON file")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = backtest_tickers(
+        args.tickers,
+        workers=args.workers,
+        days=args.days,
+        step=args.step,
+        start_date=args.start,
+        backend=args.backend,
+        batch_size=args.batch_size,
+    )
+    print_summary(results)
+    print(f"\n⏱️ Backtested {len(results)} tickers in {time.perf_counter() - start:.1f}s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results saved to {args.output}")
+
+    return 0 if all(results.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
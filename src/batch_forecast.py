@@ -0,0 +1,297 @@
+import argparse
+import json
+import os
+import sys
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.download_data import load_historical_data
+from src.model_registry import get_model
+from src.predict import get_recommendation
+from src.preprocess import prepare_inference_window
+from src.storage import TICKERS
+
+
+# (group model ids) -> compiled group forecaster. Entries are dropped as soon
+# as any of their models is collected (e.g. evicted from the registry).
+_group_forecasters = {}
+
+
+#----------------------------------------
+# Architecture Grouping
+#----------------------------------------
+
+def architecture_signature(model):
+    """Hashable description of a model's layers and weight shapes"""
+    layers = []
+    for layer in model.layers:
+        config = layer.get_config()
+        layers.append((
+            layer.__class__.__name__,
+            config.get('units'),
+            config.get('return_sequences'),
+            tuple(tuple(w.shape) for w in layer.weights),
+        ))
+    return tuple(layers)
+
+
+def group_by_architecture(models):
+    """Group {ticker: model} into lists of tickers whose models share an architecture"""
+    groups = {}
+    for ticker, model in models.items():
+        groups.setdefault(architecture_signature(model), []).append(ticker)
+    return list(groups.values())
+
+
+#----------------------------------------
+# Group Forecaster
+#----------------------------------------
+
+def _layer_config(layer, key, default=None):
+    return layer.get_config().get(key, default)
+
+
+def stack_group_weights(models):
+    """
+    The group's LSTM and Dense weights stacked along a leading model axis,
+    one dict per layer (Dropout is the identity at inference). Returns None
+    when a layer cannot be stacked, e.g. another layer type or activation.
+    """
+    stacked = []
+    for layers in zip(*(model.layers for model in models)):
+        kind = layers[0].__class__.__name__
+        if kind in ('InputLayer', 'Dropout'):
+            continue
+        if any(layer.__class__.__name__ != kind or not _layer_config(layer, 'use_bias', True) for layer in layers):
+            return None
+        weights = [np.stack(arrays).astype(np.float32) for arrays in zip(*(layer.get_weights() for layer in layers))]
+
+        if kind == 'LSTM' and all(
+                _layer_config(layer, 'activation') == 'tanh' and _layer_config(layer, 'recurrent_activation') == 'sigmoid'
+                and not _layer_config(layer, 'go_backwards') for layer in layers):
+            stacked.append({
+                'type': 'lstm',
+                'units': int(_layer_config(layers[0], 'units')),
+                'return_sequences': bool(_layer_config(layers[0], 'return_sequences')),
+                'kernel': weights[0],
+                'recurrent_kernel': weights[1],
+                'bias': weights[2],
+            })
+        elif kind == 'Dense' and all(_layer_config(layer, 'activation', 'linear') == 'linear' for layer in layers):
+            stacked.append({'type': 'dense', 'kernel': weights[0], 'bias': weights[1]})
+        else:
+            return None
+    return stacked
+
+
+def _build_stacked_forecaster(stacked):
+    """
+    Compile the group as one batched model: every layer multiplies the
+    windows of all models by their stacked weights in a single einsum, so each
+    forecast step is one call for the whole group. Holds only the weights.
+    """
+    import tensorflow as tf
+
+    layers = [{k: tf.constant(v) if isinstance(v, np.ndarray) else v for k, v in layer.items()} for layer in stacked]
+
+    def forward(x):
+        # x: [n_models, time_step, features]
+        for layer in layers:
+            if layer['type'] == 'dense':
+                x = tf.einsum('gi,gio->go', x, layer['kernel']) + layer['bias']
+                continue
+
+            # Input contribution for every timestep at once, then the recurrence
+            xw = tf.einsum('gti,gio->gto', x, layer['kernel']) + layer['bias'][:, None, :]
+            h = tf.zeros([tf.shape(x)[0], layer['units']])
+            c = tf.zeros_like(h)
+            sequence = tf.TensorArray(tf.float32, size=tf.shape(x)[1])
+            for t in tf.range(tf.shape(x)[1]):
+                z = xw[:, t] + tf.einsum('gu,guo->go', h, layer['recurrent_kernel'])
+                # Keras gate order: input, forget, cell candidate, output
+                i_gate, f_gate, g_gate, o_gate = tf.split(z, 4, axis=-1)
+                c = tf.sigmoid(f_gate) * c + tf.sigmoid(i_gate) * tf.tanh(g_gate)
+                h = tf.sigmoid(o_gate) * tf.tanh(c)
+                sequence = sequence.write(t, h)
+            x = tf.transpose(sequence.stack(), [1, 0, 2]) if layer['return_sequences'] else h
+        return x
+
+    @tf.function(reduce_retracing=True)
+    def forecast(windows, days):
+        predictions = tf.TensorArray(tf.float32, size=days)
+        for step in tf.range(days):
+            current_pred = forward(windows)  # [n_models, 1]
+            predictions = predictions.write(step, current_pred[:, 0])
+            windows = tf.concat([windows[:, 1:, :], current_pred[:, None, :]], axis=1)
+        return tf.transpose(predictions.stack())
+
+    return forecast
+
+
+def _build_group_forecaster(models):
+    """
+    Compile one graph that runs every model in the group side by side, for
+    groups whose weights cannot be stacked: each step calls every model on its
+    own window within the one graph. Holds the models only weakly.
+    """
+    import tensorflow as tf
+
+    model_refs = [weakref.ref(model) for model in models]
+
+    @tf.function(reduce_retracing=True)
+    def forecast(windows, days):
+        members = [model_ref() for model_ref in model_refs]
+        predictions = tf.TensorArray(tf.float32, size=days)
+        for step in tf.range(days):
+            outputs = [
+                tf.cast(model(windows[i:i + 1], training=False), tf.float32)
+                for i, model in enumerate(members)
+            ]
+            current_pred = tf.concat(outputs, axis=0)  # [n_models, 1]
+            predictions = predictions.write(step, current_pred[:, 0])
+            windows = tf.concat([windows[:, 1:, :], current_pred[:, None, :]], axis=1)
+        return tf.transpose(predictions.stack())
+
+    return forecast
+
+
+def _group_forecaster(models):
+    key = tuple(id(model) for model in models)
+    forecaster = _group_forecasters.get(key)
+    if forecaster is None:
+        stacked = stack_group_weights(models)
+        forecaster = _build_stacked_forecaster(stacked) if stacked is not None else _build_group_forecaster(models)
+        _group_forecasters[key] = forecaster
+        for model in models:
+            weakref.finalize(model, _group_forecasters.pop, key, None)
+    return forecaster
+
+
+def forecast_group(models, windows, days=7):
+    """
+    Forecast `days` steps for a list of same-architecture models in one call.
+    `windows` has shape [n_models, time_step, 1]; returns scaled predictions [n_models, days].
+    """
+    import tensorflow as tf
+
+    forecaster = _group_forecaster(list(models))
+    windows = tf.convert_to_tensor(np.asarray(windows, dtype=np.float32))
+    return forecaster(windows, tf.constant(int(days), dtype=tf.int32)).numpy()
+
+
+#----------------------------------------
+# Batch Forecast
+#----------------------------------------
+
+def _prepare_ticker(ticker):
+    """Load data and model for one ticker; returns None when anything is missing"""
+    df = load_historical_data(ticker)
+    if df is None or df.empty:
+        print(f"❌ No data for {ticker}")
+        return None
+
+    x_input, scaler = prepare_inference_window(df, ticker)
+    if x_input is None:
+        return None
+
+    model = get_model(ticker)
+    if model is None:
+        return None
+
+    return {
+        'model': model,
+        'x_input': x_input,
+        'scaler': scaler,
+        'last_date': df['Date'].iloc[-1],
+        'last_price': float(df['Close'].iloc[-1]),
+    }
+
+
+def batch_forecast(tickers=None, days=7, max_workers=None):
+    """
+    Forecast the next `days` closing prices for several tickers at once.
+
+    Data and models are loaded concurrently, then tickers whose models share
+    an architecture are forecast together in one compiled call. Returns
+    {ticker: result}; tickers that could not be loaded map to None, and the
+    tickers of a group whose forecast raised map to {'ticker', 'error'}.
+    """
+    tickers = list(tickers or TICKERS)
+    max_workers = max_workers or min(len(tickers), os.cpu_count() or 1)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        prepared = dict(zip(tickers, pool.map(_prepare_ticker, tickers)))
+
+    ready = {ticker: item for ticker, item in prepared.items() if item is not None}
+    groups = group_by_architecture({ticker: item['model'] for ticker, item in ready.items()})
+
+    def run_group(group):
+        try:
+            windows = np.concatenate([ready[ticker]['x_input'] for ticker in group], axis=0)
+            scaled = forecast_group([ready[ticker]['model'] for ticker in group], windows, days=days)
+        except Exception as e:
+            # One bad model or window only fails its own group
+            print(f"❌ Forecast failed for {', '.join(group)}: {str(e)}")
+            return group, e
+        return group, scaled
+
+    results = {ticker: None for ticker in tickers}
+    with ThreadPoolExecutor(max_workers=max(1, min(len(groups), max_workers))) as pool:
+        for group, scaled in pool.map(run_group, groups):
+            if isinstance(scaled, Exception):
+                for ticker in group:
+                    results[ticker] = {'ticker': ticker, 'error': str(scaled)}
+                continue
+            for ticker, scaled_prices in zip(group, scaled):
+                item = ready[ticker]
+                predicted_prices = item['scaler'].inverse_transform(scaled_prices.reshape(-1, 1)).flatten()
+                rec, reason, _, _ = get_recommendation(predicted_prices, item['last_price'])
+                results[ticker] = {
+                    'ticker': ticker,
+                    'last_date': str(item['last_date'].date()),
+                    'last_price': item['last_price'],
+                    'predicted_prices': [float(p) for p in predicted_prices],
+                    'recommendation': rec,
+                    'reason': reason,
+                }
+
+    return results
+
+
+#----------------------------------------
+# Command Line
+#----------------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Forecast several tickers in one batch")
+    parser.add_argument('tickers', nargs='*', default=TICKERS, help="Tickers to forecast (default: all)")
+    parser.add_argument('--days', type=int, default=7, help="Forecast horizon in trading days")
+    parser.add_argument('--workers', type=int, default=None, help="Thread pool size")
+    parser.add_argument('--output', default=None, help="Write the forecasts to this JSON file")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = batch_forecast(args.tickers, days=args.days, max_workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    for ticker, result in results.items():
+        if result is None or 'error' in result:
+            print(f"❌ {ticker}: forecast failed" + (f" ({result['error']})" if result else ''))
+        else:
+            prices = ', '.join(f"{p:.2f}" for p in result['predicted_prices'])
+            print(f"📈 {ticker} ({result['recommendation']}): {prices}")
+    print(f"⏱️ Forecast {len(results)} tickers in {elapsed:.2f}s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Forecasts saved to {args.output}")
+
+    return 0 if all(result and 'error' not in result for result in results.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
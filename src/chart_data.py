@@ -0,0 +1,169 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+#---------------------------------
+# Downsampling
+#---------------------------------
+
+# Upper bound on the points sent to the browser per chart series
+DEFAULT_MAX_POINTS = int(os.environ.get('STOCK_CHART_POINTS', '1000'))
+DOWNSAMPLE_METHODS = ['lttb', 'minmax']
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets: indices of `threshold` points of (x, y)
+    that keep the visual shape of the line. The first and last points are
+    always kept; each bucket in between contributes the point forming the
+    largest triangle with the previously kept point and the next bucket's mean.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, threshold):
+    """
+    Indices of the minimum and maximum of each of (threshold - 2) // 2 equal
+    buckets, plus the first and last points, so every peak and trough survives.
+    """
+    n = len(y)
+    buckets = max((threshold - 2) // 2, 1)
+    if threshold >= n:
+        return np.arange(n)
+
+    size = -(-n // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(buckets, size)
+    # Buckets left empty by the padding are dropped
+    filled = ~np.isnan(padded).all(axis=1)
+    offsets = np.arange(buckets)[filled] * size
+    lows = np.nanargmin(padded[filled], axis=1) + offsets
+    highs = np.nanargmax(padded[filled], axis=1) + offsets
+    return np.unique(np.concatenate([[0, n - 1], lows, highs]))
+
+
+def downsample_frame(df, max_points=DEFAULT_MAX_POINTS, method='lttb', column='Close'):
+    """
+    Rows of `df` chosen by downsampling `column` to at most `max_points`
+    points. Every other column (e.g. precomputed moving averages) is carried
+    along for the chosen rows. Frames already within the bound are returned as is.
+    """
+    if len(df) <= max_points:
+        return df
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method {method!r}; expected one of {DOWNSAMPLE_METHODS}")
+
+    y = df[column].to_numpy(dtype=np.float64)
+    if method == 'lttb':
+        x = df['Date'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        indices = lttb_indices(x, y, max_points)
+    else:
+        indices = minmax_indices(y, max_points)
+    return df.iloc[indices]
+
+
+#---------------------------------
+# Chart Ranges
+#---------------------------------
+
+CHART_RANGES = {
+    '1w': pd.DateOffset(weeks=1),
+    '1m': pd.DateOffset(months=1),
+    '3m': pd.DateOffset(months=3),
+    '1y': pd.DateOffset(years=1),
+    'all': None,
+}
+
+# The range selector's short views zoom into this recent span, so it is kept at full resolution when it fits
+DETAIL_RANGE = '3m'
+
+
+def range_rows(df, chart_range):
+    """Rows of `df` within `chart_range` (a CHART_RANGES key) of its last date"""
+    if chart_range not in CHART_RANGES:
+        raise ValueError(f"Unknown chart range {chart_range!r}; expected one of {list(CHART_RANGES)}")
+    offset = CHART_RANGES[chart_range]
+    if offset is None or df.empty:
+        return df
+    start = int(np.searchsorted(df['Date'].to_numpy(), np.datetime64(df['Date'].iloc[-1] - offset), side='left'))
+    return df.iloc[start:]
+
+
+def bounded_chart_frame(df, chart_range='all', max_points=DEFAULT_MAX_POINTS, method='lttb'):
+    """
+    At most `max_points` rows of `df` covering `chart_range`. The
+    DETAIL_RANGE tail gets half of the budget and the older history the rest,
+    so zooming in with the range selector still shows daily detail.
+    """
+    rows = range_rows(df, chart_range)
+    if len(rows) <= max_points:
+        return rows
+
+    detail = range_rows(rows, DETAIL_RANGE)
+    if len(detail) == len(rows):
+        return downsample_frame(rows, max_points, method)
+    older = rows.iloc[:len(rows) - len(detail)]
+    budget = max_points // 2
+    return pd.concat([
+        downsample_frame(older, max_points - min(len(detail), budget), method),
+        downsample_frame(detail, budget, method),
+    ])
+
+
+#---------------------------------
+# Chart Frame Cache
+#---------------------------------
+
+# (ticker, range, max_points, method) -> dict(frame, signature)
+_chart_frames = {}
+_chart_lock = threading.Lock()
+
+
+def chart_frame(ticker, chart_range='all', max_points=DEFAULT_MAX_POINTS, method='lttb'):
+    """
+    Bounded chart data for a ticker: the feature frame (prices with the
+    precomputed MA5/MA20 columns) for `chart_range`, downsampled to at most
+    `max_points` rows. Cached per (ticker, range, resolution, method) while
+    the source files are unchanged. Returns None when there is no data.
+    """
+    from src.features import get_feature_frame
+    from src.frame_cache import source_signature
+
+    key = (ticker, chart_range, max_points, method)
+    signature = source_signature(ticker)
+    with _chart_lock:
+        entry = _chart_frames.get(key)
+    if entry is not None and entry['signature'] == signature:
+        return entry['frame']
+
+    df = get_feature_frame(ticker)
+    if df is None or df.empty:
+        return None
+
+    frame = bounded_chart_frame(df, chart_range, max_points, method)
+    with _chart_lock:
+        _chart_frames[key] = {'frame': frame, 'signature': signature}
+    return frame
@@ -1,7 +1,11 @@
 from datetime import datetime, date, timedelta
-import yfinance as yf
 import os
 import pandas as pd
+from src.frame_cache import get_combined_frame
+from src.instrumentation import span
+from src.market_calendar import last_completed_trading_day, next_trading_day
+from src.providers import DEFAULT_PROVIDER
+from src.storage import DEFAULT_INTERVAL, STORE_DIR, append_bars, check_interval, last_bar_time
 import sys
 sys.path.append(os.path.abspath('..'))
 
@@ -11,34 +15,68 @@ sys.path.append(os.path.abspath('..'))
 # Should Download Stock Data
 #---------------------------------
 
-def should_download(ticker):
-    """Check if new data is needed for the ticker"""
-    file_path = os.path.join(f"data/{ticker}_clean.csv")
-
-    if os.path.exists(file_path):
-        try:
-            df = pd.read_csv(file_path)
-            df['Date'] = pd.to_datetime(df['Date'])
-            last_date = df['Date'].max().date()
-            today = datetime.today().date()-timedelta(days=1)
-
-            # If latest date is today, no need to download
-            if last_date == today:
-                print(f"✅ Data is already up to date for {ticker} (last date: {last_date})")
-                return False
-            else:
-                print(f"🔁 Data is outdated for {ticker} (last date: {last_date})")
-                os.remove(file_path)  # Delete outdated file
-                return True
-
-        except Exception as e:
-            print(f"⚠️ Error reading {file_path}: {e}")
-            os.remove(file_path)  # Remove corrupted file
-            return True
-    else:
-        # No file exists — we need to download
+def should_download(ticker, interval=DEFAULT_INTERVAL):
+    """Check if new data is needed for the ticker (the last completed trading day is missing)"""
+    try:
+        last_bar = last_bar_time(ticker, interval)
+        last_date = last_bar.date() if last_bar is not None else None
+    except Exception as e:
+        print(f"⚠️ Error reading stored data for {ticker}: {e}")
+        return True
+
+    if last_date is None:
+        # Nothing stored yet — we need to download
         return True
 
+    expected_date = last_completed_trading_day()
+    if last_date >= expected_date:
+        print(f"✅ Data is already up to date for {ticker} (last date: {last_date})")
+        return False
+
+    print(f"🔁 Data is outdated for {ticker} (last date: {last_date}, expected: {expected_date})")
+    return True
+
+
+
+#---------------------------------
+# Incremental Sync
+#---------------------------------
+
+DEFAULT_START_DATE = '2025-01-01'
+
+
+def sync_ticker(ticker, provider=None, start_date=DEFAULT_START_DATE, interval=DEFAULT_INTERVAL, store_dir=STORE_DIR):
+    """
+    Fetch only the bars after the last stored one and append them to the store.
+    Intraday intervals refetch the last stored day, since it may have been partial.
+    Returns the number of rows added, or None if the download failed.
+    """
+    provider = provider or DEFAULT_PROVIDER
+    try:
+        last_bar = last_bar_time(ticker, interval, store_dir)
+        last_date = last_bar.date() if last_bar is not None else None
+        end_date = last_completed_trading_day()
+
+        if last_date is not None and last_date >= end_date:
+            print(f"✅ Data is already up to date for {ticker} (last date: {last_date})")
+            return 0
+
+        if last_date is None:
+            fetch_from = start_date
+        else:
+            fetch_from = next_trading_day(last_date) if interval == '1d' else last_date
+        with span('download', ticker, provider=provider.name, interval=interval):
+            new_bars = provider.fetch(ticker, fetch_from, end_date, interval)
+        with span('clean', ticker) as fields:
+            added = append_bars(ticker, new_bars, interval, store_dir)
+            fields['rows_added'] = added
+
+        print(f"✅ Synced {ticker} from {provider.name}: {added} new rows ({fetch_from} → {end_date})")
+        return added
+
+    except Exception as e:
+        print(f"❌ Error syncing {ticker}: {str(e)}")
+        return None
 
 
 
@@ -46,14 +84,20 @@ def should_download(ticker):
 # Download Stock Data
 #---------------------------------
 
-def download_stock_data(symbol: str):
+def download_stock_data(symbol: str, interval=DEFAULT_INTERVAL, start_date=DEFAULT_START_DATE):
     """
-    Download stock data from Yahoo Finance from Jan 1, 2025 to today.
+    Download stock data from Yahoo Finance from `start_date` (Jan 1, 2025) to today.
+    Intraday intervals start as far back as Yahoo Finance serves them.
     """
+    import yfinance as yf
+    from src.providers import YAHOO_MAX_LOOKBACK_DAYS
+
     try:
-        # Get today's date and the date two years ago
+        check_interval(interval)
         end_date = datetime.today().strftime('%Y-%m-%d')
-        start_date = '2025-01-01'
+        if interval in YAHOO_MAX_LOOKBACK_DAYS:
+            earliest = date.today() - timedelta(days=YAHOO_MAX_LOOKBACK_DAYS[interval] - 1)
+            start_date = max(pd.Timestamp(start_date).date(), earliest).strftime('%Y-%m-%d')
 
         # Ensure the 'data' directory exists, create if not
         directory = 'data'
@@ -61,10 +105,11 @@ def download_stock_data(symbol: str):
             os.makedirs(directory)
 
         # Download the stock data
-        stock_data = yf.download(symbol, start=start_date, end=end_date, auto_adjust=False)
+        stock_data = yf.download(symbol, start=start_date, end=end_date, interval=interval, auto_adjust=False)
         
         # Save the downloaded data to a CSV file in the 'data' directory
-        file_path = os.path.join(directory, f'{symbol}_recent.csv')
+        suffix = 'recent' if interval == '1d' else f'{interval}_recent'
+        file_path = os.path.join(directory, f'{symbol}_{suffix}.csv')
         stock_data.to_csv(file_path)
 
         print(f"✅ Downloaded recent data saved to {file_path}")
@@ -81,51 +126,19 @@ def download_stock_data(symbol: str):
 #---------------------------------
 def load_historical_data(symbol: str):
     """
-    Load and combine historical + recent data for the given ticker symbol.
-    Ensures columns match before combining.
+    Load historical + recent data for the given ticker symbol from the price store.
+    Returns a frame with a 'Date' column, sorted and without duplicate dates.
+    The merged frame is cached in memory until its source files change.
     """
     try:
-        hist_path = os.path.join('historical', f'{symbol}.csv')
-        recent_path = os.path.join('data', f'{symbol}_clean.csv')
-
-        dfs = []
-
-        # Load historical data
-        if os.path.exists(hist_path):
-            hist_df = pd.read_csv(hist_path)
-            hist_df.rename(columns=lambda x: x.strip().capitalize(), inplace=True)
-            hist_df = hist_df[['Date', 'Open', 'High', 'Low', 'Close', 'Volume']]
-            hist_df['Date'] = pd.to_datetime(hist_df['Date'])
-            dfs.append(hist_df)
-            print(f"✅ Loaded historical data from {hist_path}")
-        else:
-            print(f"⚠️ Historical file not found: {hist_path}")
-
-        # Load recent data
-        if os.path.exists(recent_path):
-            recent_df = pd.read_csv(recent_path)
-            recent_df.rename(columns=lambda x: x.strip().capitalize(), inplace=True)
-            recent_df = recent_df[['Date', 'Open', 'High', 'Low', 'Close', 'Volume']]
-            recent_df['Date'] = pd.to_datetime(recent_df['Date'])
-            dfs.append(recent_df)
-            print(f"✅ Loaded recent data from {recent_path}")
-        else:
-            print(f"⚠️ Recent file not found: {recent_path}")
-
-        # Combine and clean
-        if dfs:
-            combined_df = pd.concat(dfs)
-            combined_df.drop_duplicates(subset='Date', inplace=True)
-            combined_df.sort_values('Date', inplace=True)
-            combined_df.reset_index(drop=True, inplace=True)
-
-            os.makedirs('combine_data', exist_ok=True)
-            combined_df.to_csv(f'combine_data/{symbol}_combine.csv', index=False)
-            return combined_df
-        else:
+        with span('merge', symbol):
+            combined_df = get_combined_frame(symbol)
+        if combined_df is None:
             print("❌ No data files found to combine.")
             return None
 
+        return combined_df
+
     except Exception as e:
         print(f"❌ Error loading or combining data: {str(e)}")
         return None
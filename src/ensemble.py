@@ -0,0 +1,298 @@
+import argparse
+import glob
+import os
+import sys
+import weakref
+
+import numpy as np
+
+from src.model_registry import MODEL_DIR, get_registry, model_path_for
+from src.scalers import load_scaler, scaler_path
+from src.storage import TICKERS
+
+
+#---------------------------------
+# Ensemble Members
+#---------------------------------
+
+# An ensemble of fewer distinct models would report disagreement that is not there
+MIN_MEMBERS = 2
+
+# Model directories whose <TICKER>_model.h5 files form the ensemble, and their
+# weights (comma-separated, one per directory; equal weights by default). Each
+# directory also needs the <TICKER>_scaler.json its model was trained with.
+ENSEMBLE_MODEL_DIRS = [d for d in os.environ.get('STOCK_ENSEMBLE_DIRS', f"{MODEL_DIR},rough/model").split(',') if d]
+ENSEMBLE_WEIGHTS = os.environ.get('STOCK_ENSEMBLE_WEIGHTS')
+
+
+def parse_weights(text):
+    """'0.7,0.3' -> [0.7, 0.3]; None or '' -> None (equal weights)"""
+    if not text:
+        return None
+    return [float(w) for w in text.split(',')]
+
+
+def member_dirs(ticker, model_dirs=None):
+    """The model directories that hold a model for `ticker`"""
+    return [d for d in (model_dirs or ENSEMBLE_MODEL_DIRS) if os.path.exists(model_path_for(ticker, d))]
+
+
+def validate_members(ticker, model_dirs=None):
+    """
+    Split the directories holding a model for `ticker` into usable members and
+    rejected ones: (members, [(directory, reason), ...]). A member needs its own
+    scaler artefact, since the ensemble cannot know which scale an unlabelled
+    model was trained on, and weights of its own: a file identical to an earlier
+    member's, or to a model another ticker has a scaler for in the same
+    directory, is rejected (rough/model/MSFT_model.h5 is a copy of AAPL's).
+    """
+    from src.forecast_cache import file_hash
+
+    members, rejected, seen = [], [], {}
+    for model_dir in member_dirs(ticker, model_dirs):
+        path = model_path_for(ticker, model_dir)
+        digest = file_hash(path)
+        copies = [other for other in sorted(glob.glob(os.path.join(model_dir, '*_model.h5')))
+                  if os.path.basename(other) != os.path.basename(path) and file_hash(other) == digest
+                  and os.path.exists(scaler_path(os.path.basename(other)[:-len('_model.h5')], model_dir))]
+        if load_scaler(ticker, model_dir) is None:
+            rejected.append((model_dir, f"no scaler artefact {scaler_path(ticker, model_dir)}"))
+        elif digest in seen:
+            rejected.append((model_dir, f"same weights as {seen[digest]}"))
+        elif copies:
+            rejected.append((model_dir, f"same weights as {copies[0]}"))
+        else:
+            seen[digest] = path
+            members.append(model_dir)
+    return members, rejected
+
+
+def member_files(ticker, model_dirs=None):
+    """
+    Every file the ensemble for `ticker` depends on: the common scaler and,
+    per directory, the ticker's scaler and all models (compared by validate_members)
+    """
+    files = [scaler_path(ticker)]
+    for model_dir in (model_dirs or ENSEMBLE_MODEL_DIRS):
+        files.append(scaler_path(ticker, model_dir))
+        files.extend(sorted(glob.glob(os.path.join(model_dir, '*_model.h5'))))
+    return files
+
+
+def member_weights(weights, model_dirs, members):
+    """The weights of the accepted `members`, from weights given per directory in `model_dirs`"""
+    if weights is None:
+        return None
+    if len(weights) != len(model_dirs):
+        raise ValueError(f"Expected one ensemble weight per directory {model_dirs}, got {weights}")
+    return [w for model_dir, w in zip(model_dirs, weights) if model_dir in members]
+
+
+def scale_map(common, scaler):
+    """
+    (gain, offset) taking values scaled by `common` to the scale of `scaler`
+    (both single-feature MinMaxScalers): member = common * gain + offset
+    """
+    gain = float(scaler.scale_[0] / common.scale_[0])
+    return gain, float(scaler.min_[0] - common.min_[0] * gain)
+
+
+def normalise_weights(weights, members):
+    """Weights as an array summing to one; equal weights when `weights` is None"""
+    if weights is None:
+        return np.full(members, 1.0 / members)
+    weights = np.asarray(weights, dtype=np.float64)
+    if len(weights) != members or (weights < 0).any() or weights.sum() <= 0:
+        raise ValueError(f"Expected {members} non-negative ensemble weights, got {weights.tolist()}")
+    return weights / weights.sum()
+
+
+def combine_forecasts(member_forecasts, weights):
+    """
+    Weighted mean and weighted standard deviation across members of
+    [members, batch, days] forecasts. The deviation is the disagreement
+    between members; both are returned with shape [batch, days].
+    """
+    w = np.asarray(weights, dtype=np.float64)[:, None, None]
+    combined = (w * member_forecasts).sum(axis=0)
+    disagreement = np.sqrt((w * (member_forecasts - combined) ** 2).sum(axis=0))
+    return combined, disagreement
+
+
+#---------------------------------
+# Ensemble Backend
+#---------------------------------
+
+# (member model ids, scale maps) -> compiled forecaster. Entries are dropped as
+# soon as any of their models is collected (e.g. evicted from the registry).
+_forecasters = {}
+
+
+def _build_ensemble_forecaster(models, scales):
+    """
+    Compile the autoregressive loop of every member into a single TensorFlow
+    graph. All members start from the same windows, mapped to their own scale,
+    and each feeds back its own predictions; returns forecasts on the common
+    scale with shape [members, batch, days]. Holds the models only weakly.
+    """
+    import tensorflow as tf
+
+    model_refs = [weakref.ref(model) for model in models]
+
+    @tf.function(reduce_retracing=True)
+    def forecast(window, days):
+        members = [model_ref() for model_ref in model_refs]
+        windows = [window * gain + offset for gain, offset in scales]
+        predictions = tf.TensorArray(tf.float32, size=days)
+        for i in tf.range(days):
+            # The member calls are independent ops, so TensorFlow can run them side by side
+            preds = [tf.cast(model(w, training=False), tf.float32) for model, w in zip(members, windows)]
+            predictions = predictions.write(i, tf.stack([(pred[:, 0] - offset) / gain
+                                                         for pred, (gain, offset) in zip(preds, scales)]))
+            windows = [tf.concat([w[:, 1:, :], pred[:, None, :]], axis=1) for w, pred in zip(windows, preds)]
+        return tf.transpose(predictions.stack(), [1, 2, 0])
+
+    return forecast
+
+
+def _ensemble_forecaster(models, scales):
+    key = (tuple(id(model) for model in models), tuple(scales))
+    forecaster = _forecasters.get(key)
+    if forecaster is None:
+        forecaster = _forecasters[key] = _build_ensemble_forecaster(models, scales)
+        for model in models:
+            weakref.finalize(model, _forecasters.pop, key, None)
+    return forecaster
+
+
+class EnsembleBackend:
+    """
+    Every model variant of a ticker (one per directory in ENSEMBLE_MODEL_DIRS)
+    evaluated in one compiled pass over the same input windows, combined with
+    configurable weights. Members without their own scaler, or duplicating
+    another model file, are skipped (see validate_members); fewer than
+    MIN_MEMBERS remaining raises ValueError rather than running a one-model
+    "ensemble". Windows and
+    forecasts are on the scale of the ticker's scaler in MODEL_DIR, the one
+    prepare_inference_window uses. Models come from the shared registry.
+    """
+    name = 'ensemble'
+
+    def __init__(self, ticker, model_dirs=None, weights=None):
+        model_dirs = model_dirs or ENSEMBLE_MODEL_DIRS
+        self.ticker = ticker
+        self.members, rejected = validate_members(ticker, model_dirs)
+        for model_dir, reason in rejected:
+            print(f"⚠️ Skipping ensemble member {model_dir} for {ticker}: {reason}")
+        if not self.members:
+            raise FileNotFoundError(f"No ensemble models for {ticker}")
+        if len(self.members) < MIN_MEMBERS:
+            raise ValueError(f"Ensemble for {ticker} needs at least {MIN_MEMBERS} distinct members, "
+                             f"only {self.members} passed validation")
+
+        common = load_scaler(ticker)
+        if common is None:
+            raise FileNotFoundError(f"No scaler artefact {scaler_path(ticker)} to put the ensemble members on one scale")
+        self.scales = [scale_map(common, load_scaler(ticker, d)) for d in self.members]
+        weights = parse_weights(ENSEMBLE_WEIGHTS) if weights is None else weights
+        self.weights = normalise_weights(member_weights(weights, model_dirs, self.members), len(self.members))
+
+    def _models(self):
+        models = [get_registry().get(self.ticker, d) for d in self.members]
+        if any(model is None for model in models):
+            raise FileNotFoundError(f"Could not load the ensemble models for {self.ticker}")
+        return models
+
+    def member_forecasts_scaled(self, windows, days=7):
+        """Scaled forecasts of every member, shape [members, batch, days]"""
+        import tensorflow as tf
+
+        forecaster = _ensemble_forecaster(self._models(), self.scales)
+        window = tf.convert_to_tensor(np.asarray(windows, dtype=np.float32))
+        return forecaster(window, tf.constant(int(days), dtype=tf.int32)).numpy()
+
+    def forecast_scaled(self, windows, days=7):
+        combined, _ = combine_forecasts(self.member_forecasts_scaled(windows, days), self.weights)
+        return combined.astype(np.float32)
+
+    def predict_scaled(self, windows):
+        return self.forecast_scaled(windows, days=1)
+
+
+def forecast_ensemble(ticker, x_input, scaler, days=7, backend=None):
+    """
+    Combined forecast for one window with the members' forecasts and their
+    disagreement, in price units. `backend` is an EnsembleBackend (the cached
+    one from src.inference.get_backend by default). Returns a dict or None.
+    """
+    from src.inference import get_backend
+    from src.instrumentation import span
+
+    with span('model_load', ticker, backend='ensemble'):
+        instance = backend or get_backend(ticker, 'ensemble')
+    if instance is None:
+        return None
+    try:
+        with span('inference', ticker, backend='ensemble', days=days, members=len(instance.members)):
+            scaled = instance.member_forecasts_scaled(x_input[:1], days=days)[:, 0]
+        members = scaler.inverse_transform(scaled.reshape(-1, 1)).reshape(len(instance.members), days)
+    except Exception as e:
+        print(f"Error forecasting ensemble: {str(e)}")
+        return None
+
+    combined, disagreement = combine_forecasts(members[:, None], instance.weights)
+    combined, disagreement = combined[0], disagreement[0]
+    # Share of the weight on members that call the same day-`days` direction as the ensemble
+    last_scaled = float(x_input[0, -1, 0])
+    last_price = float(scaler.inverse_transform([[last_scaled]])[0, 0])
+    agrees = np.sign(members[:, -1] - last_price) == np.sign(combined[-1] - last_price)
+    return {
+        'members': instance.members,
+        'weights': instance.weights.tolist(),
+        'member_prices': members.tolist(),
+        'predicted_prices': combined.tolist(),
+        'disagreement': disagreement.tolist(),
+        'disagreement_pct': float(disagreement[-1] / combined[-1] * 100),
+        'direction_agreement': float(instance.weights[agrees].sum()),
+    }
+
+
+#---------------------------------
+# Command Line
+#---------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ensemble forecast over every model directory")
+    parser.add_argument('tickers', nargs='*', default=TICKERS, help="Tickers to forecast (default: all)")
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--model-dirs', default=None, help="Comma-separated model directories (default: STOCK_ENSEMBLE_DIRS)")
+    parser.add_argument('--weights', default=None, help="Comma-separated weights, one per directory (default: STOCK_ENSEMBLE_WEIGHTS or equal)")
+    args = parser.parse_args(argv)
+
+    from src.download_data import load_historical_data
+    from src.preprocess import prepare_inference_window
+
+    model_dirs = args.model_dirs.split(',') if args.model_dirs else None
+    failed = []
+    for ticker in args.tickers:
+        df = load_historical_data(ticker)
+        x_input, scaler = prepare_inference_window(df, ticker) if df is not None else (None, None)
+        try:
+            backend = EnsembleBackend(ticker, model_dirs, parse_weights(args.weights)) if x_input is not None else None
+        except (FileNotFoundError, ValueError) as e:
+            print(f"❌ {ticker}: {e}")
+            backend = None
+        result = forecast_ensemble(ticker, x_input, scaler, args.days, backend) if backend is not None else None
+        if result is None:
+            failed.append(ticker)
+            continue
+
+        print(f"\n📈 {ticker}: day {args.days} ${result['predicted_prices'][-1]:.2f} "
+              f"(disagreement {result['disagreement_pct']:.2f}%, direction agreement {result['direction_agreement']:.0%})")
+        for member, weight, prices in zip(result['members'], result['weights'], result['member_prices']):
+            print(f"   {member:<14} weight {weight:.2f}  day {args.days} ${prices[-1]:.2f}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
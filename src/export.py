@@ -0,0 +1,121 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from src.model_registry import MODEL_DIR, get_registry, model_path_for
+from src.storage import TICKERS, read_combined
+
+
+#----------------------------------------
+# Export To TFLite
+#----------------------------------------
+
+def tflite_path_for(ticker, model_dir=MODEL_DIR):
+    """Path of the exported TFLite model for a ticker"""
+    return os.path.join(model_dir, f"{ticker}_model.tflite")
+
+
+def export_tflite(ticker, model_dir=MODEL_DIR, time_step=60):
+    """
+    Convert model/<T>_model.h5 to model/<T>_model.tflite.
+    The graph is frozen with a fixed [1, time_step, 1] input so the LSTM
+    loops lower to builtin TFLite ops (no TensorFlow needed at runtime).
+    """
+    import tensorflow as tf
+    from tensorflow.python.framework.convert_to_constants import convert_variables_to_constants_v2
+
+    model = get_registry().get(ticker, model_dir)
+    if model is None:
+        return None
+
+    @tf.function(input_signature=[tf.TensorSpec([1, time_step, 1], tf.float32)])
+    def serve(window):
+        return model(window, training=False)
+
+    frozen = convert_variables_to_constants_v2(serve.get_concrete_function())
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([frozen])
+    tflite_model = converter.convert()
+
+    path = tflite_path_for(ticker, model_dir)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(tflite_model)
+    os.replace(tmp_path, path)
+    return path
+
+
+#----------------------------------------
+# Parity Check
+#----------------------------------------
+
+def parity_windows(ticker, n_windows=32, time_step=60):
+    """The last `n_windows` real input windows for a ticker, scaled like at inference"""
+    from src.scalers import load_scaler
+
+    df = read_combined(ticker)
+    closes = df['Close'].to_numpy(dtype=np.float64)[-(n_windows + time_step - 1):]
+    scaler = load_scaler(ticker)
+    if scaler is not None:
+        scaled = scaler.transform(closes.reshape(-1, 1)).ravel()
+    else:
+        scaled = (closes - closes.min()) / (closes.max() - closes.min())
+    windows = np.lib.stride_tricks.sliding_window_view(scaled, time_step)
+    return windows[..., np.newaxis].astype(np.float32)
+
+
+def check_parity(ticker, backend, n_windows=32, days=7, tolerance=1e-4, model_dir=MODEL_DIR):
+    """
+    Compare an inference backend against the Keras model on real windows,
+    for one-step predictions and the full multi-day forecast.
+    Returns (ok, max_abs_diff) in scaled units.
+    """
+    from src.predict import forecast_scaled
+
+    model = get_registry().get(ticker, model_dir)
+    windows = parity_windows(ticker, n_windows)
+
+    expected_step = model(windows, training=False).numpy()
+    actual_step = backend.predict_scaled(windows)
+    expected_forecast = forecast_scaled(model, windows[-1:], days=days)
+    actual_forecast = backend.forecast_scaled(windows[-1:], days=days)
+
+    max_diff = float(max(np.abs(expected_step - actual_step).max(),
+                         np.abs(expected_forecast - actual_forecast).max()))
+    return max_diff <= tolerance, max_diff
+
+
+#----------------------------------------
+# Command Line
+#----------------------------------------
+
+def main(argv=None):
+    from src.inference import TFLiteBackend
+
+    parser = argparse.ArgumentParser(description="Export the Keras models to TFLite and check parity")
+    parser.add_argument('tickers', nargs='*', default=TICKERS, help="Tickers to export (default: all)")
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--tolerance', type=float, default=1e-4, help="Maximum allowed difference in scaled units")
+    args = parser.parse_args(argv)
+
+    failed = []
+    for ticker in args.tickers:
+        if not os.path.exists(model_path_for(ticker, args.model_dir)):
+            print(f"⚠️ No model for {ticker} (skip)")
+            continue
+
+        path = export_tflite(ticker, args.model_dir)
+        ok, max_diff = check_parity(ticker, TFLiteBackend(path), tolerance=args.tolerance, model_dir=args.model_dir)
+        if ok:
+            print(f"✅ Exported {ticker} to {path} (max diff {max_diff:.2e})")
+        else:
+            os.remove(path)
+            failed.append(ticker)
+            print(f"❌ {ticker}: TFLite output differs from Keras by {max_diff:.2e}, export removed")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,236 @@
+import copy
+import math
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+#---------------------------------
+# Indicators
+#---------------------------------
+
+MA_WINDOWS = (5, 20)
+VOLATILITY_WINDOW = 20
+RSI_WINDOW = 14
+VOLUME_WINDOW = 20
+
+PRICE_FEATURES = ['Open', 'High', 'Low', 'Close', 'Volume']
+INDICATOR_FEATURES = ['MA5', 'MA20', 'Return', 'Volatility20', 'RSI14', 'VolumeZ20']
+FEATURE_COLUMNS = PRICE_FEATURES + INDICATOR_FEATURES
+
+
+def moving_average(values, window):
+    """Trailing mean over `window` values; the first window - 1 entries are NaN"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = sliding_window_view(values, window).mean(axis=1)
+    return out
+
+
+def rolling_std(values, window):
+    """Trailing sample standard deviation (ddof=1), NaN until the window is full"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = sliding_window_view(values, window).std(axis=1, ddof=1)
+    return out
+
+
+def _wilder_averages(close):
+    """Wilder-smoothed average gain and loss of the close-to-close changes"""
+    delta = pd.Series(np.diff(close, prepend=np.nan))
+    alpha = 1.0 / RSI_WINDOW
+    avg_gain = delta.clip(lower=0).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    avg_loss = (-delta).clip(lower=0).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return avg_gain, avg_loss
+
+
+def _rsi(avg_gain, avg_loss):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+
+
+def compute_features(df):
+    """
+    Indicators for a whole price history in one vectorised pass.
+    Returns a copy of `df` with the INDICATOR_FEATURES columns added;
+    rows before an indicator's window is full hold NaN.
+    """
+    close = df['Close'].to_numpy(dtype=np.float64)
+    volume = df['Volume'].to_numpy(dtype=np.float64)
+
+    returns = np.full(len(close), np.nan)
+    returns[1:] = close[1:] / close[:-1] - 1.0
+
+    volume_std = rolling_std(volume, VOLUME_WINDOW)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volume_z = np.where(volume_std > 0, (volume - moving_average(volume, VOLUME_WINDOW)) / volume_std, 0.0)
+    volume_z[np.isnan(volume_std)] = np.nan
+
+    rsi = _rsi(*_wilder_averages(close))
+    rsi[:RSI_WINDOW] = np.nan
+
+    out = df.copy()
+    for window in MA_WINDOWS:
+        out[f'MA{window}'] = moving_average(close, window)
+    out['Return'] = returns
+    out['Volatility20'] = rolling_std(returns, VOLATILITY_WINDOW)
+    out['RSI14'] = rsi
+    out['VolumeZ20'] = volume_z
+    return out
+
+
+#---------------------------------
+# Incremental Updates
+#---------------------------------
+
+def _std(values):
+    n = len(values)
+    mean = sum(values) / n
+    return math.sqrt(sum((v - mean) ** 2 for v in values) / (n - 1))
+
+
+class IncrementalFeatures:
+    """
+    Indicator state as of the last bar seen. `update(bar)` adds one bar and
+    returns its feature row. The work per bar depends only on the indicator
+    windows, not on the length of the history.
+    """
+
+    def __init__(self):
+        self.closes = deque(maxlen=max(MA_WINDOWS))
+        self.returns = deque(maxlen=VOLATILITY_WINDOW)
+        self.volumes = deque(maxlen=VOLUME_WINDOW)
+        self.avg_gain = None
+        self.avg_loss = None
+        self.count = 0
+
+    @classmethod
+    def from_history(cls, df):
+        """State after the last bar of `df`, seeded from its tail and the Wilder averages"""
+        state = cls()
+        close = df['Close'].to_numpy(dtype=np.float64)
+        volume = df['Volume'].to_numpy(dtype=np.float64)
+        if not len(close):
+            return state
+
+        state.closes.extend(close[-state.closes.maxlen:])
+        state.volumes.extend(volume[-state.volumes.maxlen:])
+        tail = close[-(state.returns.maxlen + 1):]
+        state.returns.extend(tail[1:] / tail[:-1] - 1.0)
+        if len(close) > 1:
+            avg_gain, avg_loss = _wilder_averages(close)
+            state.avg_gain, state.avg_loss = float(avg_gain[-1]), float(avg_loss[-1])
+        state.count = len(close)
+        return state
+
+    def update(self, bar):
+        """Add one bar (a mapping with Open, High, Low, Close, Volume) and return its features as a dict"""
+        close = float(bar['Close'])
+        volume = float(bar['Volume'])
+
+        ret = np.nan
+        if self.closes:
+            previous = self.closes[-1]
+            ret = close / previous - 1.0
+            self.returns.append(ret)
+
+            # Wilder smoothing; the first change seeds the averages
+            change = close - previous
+            gain, loss = max(change, 0.0), max(-change, 0.0)
+            if self.avg_gain is None:
+                self.avg_gain, self.avg_loss = gain, loss
+            else:
+                alpha = 1.0 / RSI_WINDOW
+                self.avg_gain += alpha * (gain - self.avg_gain)
+                self.avg_loss += alpha * (loss - self.avg_loss)
+
+        self.closes.append(close)
+        self.volumes.append(volume)
+        self.count += 1
+
+        row = {column: float(bar[column]) for column in PRICE_FEATURES}
+        for window in MA_WINDOWS:
+            row[f'MA{window}'] = sum(list(self.closes)[-window:]) / window if len(self.closes) >= window else np.nan
+        row['Return'] = ret
+        row['Volatility20'] = _std(self.returns) if len(self.returns) >= VOLATILITY_WINDOW else np.nan
+
+        if self.count <= RSI_WINDOW:
+            row['RSI14'] = np.nan
+        else:
+            row['RSI14'] = 100.0 if self.avg_loss == 0 else 100.0 - 100.0 / (1.0 + self.avg_gain / self.avg_loss)
+
+        if len(self.volumes) >= VOLUME_WINDOW:
+            volume_std = _std(self.volumes)
+            mean = sum(self.volumes) / len(self.volumes)
+            row['VolumeZ20'] = (volume - mean) / volume_std if volume_std > 0 else 0.0
+        else:
+            row['VolumeZ20'] = np.nan
+        return row
+
+
+#---------------------------------
+# Feature Cache
+#---------------------------------
+
+# ticker -> dict(frame, state, rows, signature)
+_feature_frames = {}
+_feature_lock = threading.Lock()
+
+
+def bars_unchanged(df, cached, rows):
+    """True when the first `rows` bars of `df` have the dates and prices `cached` was built from"""
+    if len(df) < rows:
+        return False
+    return all(np.array_equal(df[column].to_numpy()[:rows], cached[column].to_numpy()[:rows])
+               for column in ['Date'] + PRICE_FEATURES)
+
+
+def get_features(ticker):
+    """
+    (frame, state) for a ticker: the merged price frame with indicator
+    columns, and a private copy of the incremental state after its last bar.
+    Returns (None, None) when there is no data. Features are computed once
+    per ticker and reused while the source files are unchanged; when bars are
+    appended to the store (and no earlier bar was corrected), only the new
+    bars go through the incremental engine.
+    """
+    from src.frame_cache import get_combined_frame, source_signature
+
+    signature = source_signature(ticker)
+    with _feature_lock:
+        entry = _feature_frames.get(ticker)
+    if entry is not None and entry['signature'] == signature:
+        return entry['frame'].copy(deep=False), copy.deepcopy(entry['state'])
+
+    df = get_combined_frame(ticker)
+    if df is None or df.empty:
+        return None, None
+
+    rows = len(df)
+    if entry is not None and rows > entry['rows'] and bars_unchanged(df, entry['frame'], entry['rows']):
+        state = copy.deepcopy(entry['state'])
+        new_bars = df.iloc[entry['rows']:]
+        new_rows = pd.DataFrame([state.update(bar) for bar in new_bars.to_dict('records')], index=new_bars.index)
+        new_rows.insert(0, 'Date', new_bars['Date'])
+        frame = pd.concat([entry['frame'], new_rows.astype(entry['frame'].dtypes.to_dict())])
+    elif entry is not None and rows == entry['rows'] and bars_unchanged(df, entry['frame'], rows):
+        frame, state = entry['frame'], entry['state']
+    else:
+        frame = compute_features(df)
+        state = IncrementalFeatures.from_history(df)
+
+    entry = {'frame': frame, 'state': state, 'rows': rows, 'signature': signature}
+    with _feature_lock:
+        _feature_frames[ticker] = entry
+
+    return entry['frame'].copy(deep=False), copy.deepcopy(entry['state'])
+
+
+def get_feature_frame(ticker):
+    """The merged price frame of a ticker with indicator columns, or None"""
+    return get_features(ticker)[0]
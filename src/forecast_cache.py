@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from src.inference import INFERENCE_BACKEND, forecast_price_quantiles, forecast_prices
+from src.model_registry import model_path_for
+from src.predict import get_recommendation
+from src.preprocess import prepare_inference_window
+from src.scalers import scaler_path
+
+
+#---------------------------------
+# Forecast Cache
+#---------------------------------
+
+CACHE_DIR = os.path.join('cache', 'forecasts')
+# Forecasts kept in memory; older ones are still served from disk
+DEFAULT_MAX_ENTRIES = int(os.environ.get('STOCK_FORECAST_CACHE_ENTRIES', '1024'))
+
+# (path, mtime, size) -> sha256, so unchanged files are hashed only once
+_file_hashes = {}
+
+
+def file_hash(path):
+    """sha256 of a file, or None when it does not exist"""
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    digest = _file_hashes.get(key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        _file_hashes[key] = digest
+    return digest
+
+
+def model_version(ticker, backend=None):
+    """
+    Hash of the backend's model file and the scaler artefact;
+    changes whenever either is replaced or the backend is switched.
+    """
+    from src.export import tflite_path_for
+
+    backend = backend or INFERENCE_BACKEND
+    if backend == 'ensemble':
+        from src.ensemble import ENSEMBLE_WEIGHTS, MIN_MEMBERS, validate_members
+
+        # Every accepted member's model and scaler, and the weights, are part of the version
+        members, _ = validate_members(ticker)
+        model_hash = ':'.join(f"{file_hash(model_path_for(ticker, d))}/{file_hash(scaler_path(ticker, d))}"
+                              for d in members) if len(members) >= MIN_MEMBERS else None
+        if model_hash is not None:
+            model_hash += f":{ENSEMBLE_WEIGHTS or 'equal'}"
+    else:
+        path = tflite_path_for(ticker) if backend == 'tflite' else model_path_for(ticker)
+        model_hash = file_hash(path)
+    if model_hash is None:
+        return None
+    scaler_hash = file_hash(scaler_path(ticker)) or 'refit'
+    return hashlib.sha256(f"{backend}:{model_hash}:{scaler_hash}".encode()).hexdigest()[:16]
+
+
+class ForecastCache:
+    """
+    Forecasts keyed by (ticker, last bar date, model version, horizon).
+    Entries live in memory and as JSON files under `cache_dir`, so a warm
+    cache also survives restarts. At most `max_entries` stay in memory,
+    evicted least-recently-used.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_entries=DEFAULT_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+    def _disk_path(self, key):
+        digest = hashlib.sha1(json.dumps(key).encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{key[0]}_{digest}.json")
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._stats['memory_hits'] += 1
+                return self._memory[key]
+
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    value = json.load(f)
+                with self._lock:
+                    self._remember(key, value)
+                    self._stats['disk_hits'] += 1
+                return value
+            except Exception as e:
+                print(f"⚠️ Ignoring unreadable forecast cache file {path}: {e}")
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def _remember(self, key, value):
+        """Keep an entry in memory, evicting the least recently used (caller holds the lock)"""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def put(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._disk_path(key)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self):
+        with self._lock:
+            hits = self._stats['memory_hits'] + self._stats['disk_hits']
+            lookups = hits + self._stats['misses']
+            return {**self._stats, 'hit_rate': hits / lookups if lookups else 0.0, 'entries': len(self._memory)}
+
+
+_cache = ForecastCache()
+
+
+def get_forecast_cache():
+    return _cache
+
+
+#---------------------------------
+# Cached Forecast
+#---------------------------------
+
+def cached_forecast(ticker, df, days=7, backend=None, scheduler=None, mc_samples=0):
+    """
+    Forecast for a ticker from the cache, computing and storing it on a miss.
+    `df` is the merged price frame; returns a dict with the predicted prices,
+    the recommendation and the last known price, or None when forecasting fails.
+    `backend` overrides the STOCK_INFERENCE_BACKEND setting; a `scheduler`
+    (src.scheduler.InferenceScheduler) batches the inference with concurrent calls.
+    Unbatched ensemble forecasts also carry the members' forecasts and their
+    disagreement under 'ensemble'.
+    With `mc_samples` > 0 the dict also holds per-day price quantiles
+    ({quantile: prices}) from that many Monte-Carlo dropout forecasts.
+    """
+    version = model_version(ticker, backend)
+    if version is None:
+        print(f"❌ Model not found for {ticker} ({backend or INFERENCE_BACKEND} backend)")
+        return None
+
+    last_date = str(df['Date'].iloc[-1].date())
+    key = (ticker, last_date, version, int(days))
+    if mc_samples:
+        key += (int(mc_samples),)
+
+    result = _cache.get(key)
+    if result is not None:
+        print(f"⚡ Forecast cache hit for {ticker} (last date: {last_date})")
+        return result
+
+    x_input, scaler = prepare_inference_window(df, ticker)
+    if x_input is None:
+        return None
+
+    ensemble = None
+    if (backend or INFERENCE_BACKEND) == 'ensemble' and scheduler is None:
+        from src.ensemble import forecast_ensemble
+
+        ensemble = forecast_ensemble(ticker, x_input, scaler, days=days)
+        predicted_prices = ensemble and ensemble.pop('predicted_prices')
+    else:
+        predicted_prices = forecast_prices(ticker, x_input, scaler, days=days, backend=backend, scheduler=scheduler)
+    if predicted_prices is None:
+        return None
+
+    last_price = float(df['Close'].iloc[-1])
+    rec, reason, bg_color, text_color = get_recommendation(predicted_prices, last_price)
+    result = {
+        'ticker': ticker,
+        'last_date': last_date,
+        'last_price': last_price,
+        'predicted_prices': [float(p) for p in predicted_prices],
+        'recommendation': [rec, reason, bg_color, text_color],
+    }
+    if ensemble is not None:
+        result['ensemble'] = ensemble
+    if mc_samples:
+        from src.predict import DEFAULT_QUANTILES
+
+        quantiles = forecast_price_quantiles(ticker, x_input, scaler, int(mc_samples), days=days)
+        if quantiles is not None:
+            result['mc_samples'] = int(mc_samples)
+            result['quantiles'] = {str(q): [float(p) for p in prices] for q, prices in zip(DEFAULT_QUANTILES, quantiles)}
+    _cache.put(key, result)
+    return result
@@ -0,0 +1,126 @@
+import os
+import threading
+from collections import OrderedDict
+
+from src.storage import STORE_DIR, on_prices_written, read_combined, source_path
+
+
+#---------------------------------
+# Merged Frame Cache
+#---------------------------------
+
+DEFAULT_CACHE_MB = float(os.environ.get('STOCK_FRAME_CACHE_MB', 256))
+
+
+def source_signature(ticker, store_dir=STORE_DIR):
+    """(path, mtime, size) of every file the merged frame is built from"""
+    signature = []
+    for kind in ('historical', 'recent'):
+        path = source_path(ticker, kind, store_dir)
+        if path is None:
+            signature.append((kind, None))
+        else:
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+class FrameCache:
+    """
+    Per-ticker cache of the merged historical + recent frame.
+
+    An entry is valid while its source files keep the same mtime and size.
+    Least-recently-used entries are dropped once the cached frames use more
+    than the memory budget.
+    """
+
+    def __init__(self, memory_budget_mb=DEFAULT_CACHE_MB, store_dir=STORE_DIR):
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024)
+        self.store_dir = store_dir
+        self._entries = OrderedDict()   # ticker -> dict(signature, frame, size_bytes)
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def get(self, ticker):
+        """
+        The merged frame (with a 'Date' column) for a ticker, or None when no data exists.
+        Callers get a shallow copy, so adding or replacing columns does not touch the cache.
+        """
+        signature = source_signature(ticker, self.store_dir)
+
+        with self._lock:
+            entry = self._entries.get(ticker)
+            if entry is not None and entry['signature'] == signature:
+                self._entries.move_to_end(ticker)
+                self._stats['hits'] += 1
+                return entry['frame'].copy(deep=False)
+
+        combined = read_combined(ticker, self.store_dir)
+        if combined is None:
+            return None
+        frame = combined.reset_index()
+
+        with self._lock:
+            self._stats['misses'] += 1
+            self._entries[ticker] = {
+                'signature': signature,
+                'frame': frame,
+                'size_bytes': int(frame.memory_usage(index=True).sum()),
+            }
+            self._entries.move_to_end(ticker)
+            self._evict(keep=ticker)
+
+        return frame.copy(deep=False)
+
+    def _evict(self, keep=None):
+        while self._entries and self.memory_bytes() > self.memory_budget_bytes:
+            oldest = next(iter(self._entries))
+            if oldest == keep:
+                break
+            del self._entries[oldest]
+            self._stats['evictions'] += 1
+
+    def memory_bytes(self):
+        return sum(entry['size_bytes'] for entry in self._entries.values())
+
+    def invalidate(self, ticker=None, kind=None):
+        """Drop one ticker's frame, or all frames when no ticker is given"""
+        with self._lock:
+            if ticker is None:
+                self._entries.clear()
+            elif self._entries.pop(ticker, None) is None:
+                return
+            self._stats['invalidations'] += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._stats,
+                'cached': list(self._entries.keys()),
+                'memory_bytes': self.memory_bytes(),
+                'memory_budget_bytes': self.memory_budget_bytes,
+            }
+
+
+#---------------------------------
+# Shared Cache
+#---------------------------------
+
+_cache = FrameCache()
+
+# New bars written to the store drop the stale frame right away
+on_prices_written(_cache.invalidate)
+
+
+def get_frame_cache():
+    return _cache
+
+
+def get_combined_frame(ticker):
+    """Merged historical + recent frame for a ticker from the shared cache"""
+    return _cache.get(ticker)
+
+
+def invalidate_ticker(ticker=None):
+    """Explicitly drop cached frames, e.g. after new data was written outside the store"""
+    _cache.invalidate(ticker)
@@ -0,0 +1,244 @@
+import os
+import threading
+
+import numpy as np
+
+from src.instrumentation import span
+from src.model_registry import MODEL_DIR, get_model
+
+
+#----------------------------------------
+# Inference Backends
+#----------------------------------------
+
+# 'keras' runs the .h5 models with TensorFlow, 'tflite' runs the exported
+# model/<T>_model.tflite files and 'numpy' evaluates the .h5 weights with
+# NumPy; the last two never import TensorFlow. 'ensemble' combines the Keras
+# models of several directories (src.ensemble)
+INFERENCE_BACKEND = os.environ.get('STOCK_INFERENCE_BACKEND', 'keras')
+
+
+class KerasBackend:
+    """
+    Keras model from the shared registry, forecast with the compiled multi-step loop.
+    The model is looked up on every call rather than held, so the registry's
+    memory budget and reloads apply to it.
+    """
+    name = 'keras'
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+        self._model()
+
+    def _model(self):
+        model = get_model(self.ticker)
+        if model is None:
+            raise FileNotFoundError(f"No Keras model for {self.ticker}")
+        return model
+
+    def predict_scaled(self, windows):
+        """One-step predictions for windows of shape [batch, time_step, 1]; returns [batch, 1]"""
+        return self._model()(np.asarray(windows, dtype=np.float32), training=False).numpy()
+
+    def forecast_scaled(self, windows, days=7):
+        from src.predict import forecast_scaled
+        return forecast_scaled(self._model(), windows, days=days)
+
+    def forecast_samples_scaled(self, window, samples, days=7):
+        """Monte-Carlo dropout forecasts of one window; returns [samples, days]"""
+        from src.predict import forecast_samples_scaled
+        return forecast_samples_scaled(self._model(), window, samples=samples, days=days)
+
+
+class NumpyBackend:
+    """Pure-NumPy forward pass over the weights in the Keras .h5 file"""
+    name = 'numpy'
+
+    def __init__(self, path):
+        from src.numpy_lstm import NumpyLSTMModel
+
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No model at {path}")
+        self.model = NumpyLSTMModel.from_h5(path)
+        # Workspaces are reused between calls, so calls are serialised
+        self._lock = threading.Lock()
+
+    def predict_scaled(self, windows):
+        with self._lock:
+            return self.model.predict(windows).copy()
+
+    def forecast_scaled(self, windows, days=7):
+        with self._lock:
+            return self.model.forecast(windows, days=days)
+
+
+def _tflite_interpreter(path):
+    """Interpreter from the standalone runtime, falling back to the one bundled with TensorFlow"""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        try:
+            from ai_edge_litert.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+    return Interpreter(model_path=path)
+
+
+class TFLiteBackend:
+    """
+    Exported TFLite model (fixed [1, time_step, 1] input).
+    The interpreter is not thread-safe, so calls are serialised with a lock.
+    """
+    name = 'tflite'
+
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No TFLite model at {path}; run `python -m src.export`")
+        self.path = path
+        self.interpreter = _tflite_interpreter(path)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self.time_step = int(self._input['shape'][1])
+        self._lock = threading.Lock()
+
+    def _invoke(self, window):
+        self.interpreter.set_tensor(self._input['index'], window)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self._output['index'])[0, 0]
+
+    def predict_scaled(self, windows):
+        windows = np.asarray(windows, dtype=np.float32)
+        out = np.empty((len(windows), 1), dtype=np.float32)
+        with self._lock:
+            for i in range(len(windows)):
+                out[i, 0] = self._invoke(windows[i:i + 1])
+        return out
+
+    def forecast_scaled(self, windows, days=7):
+        """Autoregressive forecast; the sliding window lives in one preallocated buffer"""
+        windows = np.asarray(windows, dtype=np.float32)
+        out = np.empty((len(windows), days), dtype=np.float32)
+        buffer = np.empty((1, self.time_step + days, 1), dtype=np.float32)
+        with self._lock:
+            for b in range(len(windows)):
+                buffer[0, :self.time_step] = windows[b]
+                for day in range(days):
+                    # A contiguous copy of the current window is required by set_tensor
+                    pred = self._invoke(np.ascontiguousarray(buffer[:, day:day + self.time_step]))
+                    buffer[0, self.time_step + day, 0] = pred
+                    out[b, day] = pred
+        return out
+
+
+#----------------------------------------
+# Backend Selection
+#----------------------------------------
+
+# (backend name, ticker) -> (source mtimes, backend instance)
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def _backend_source(ticker, backend):
+    from src.export import tflite_path_for
+    from src.model_registry import model_path_for
+
+    if backend == 'tflite':
+        return tflite_path_for(ticker, MODEL_DIR)
+    return model_path_for(ticker, MODEL_DIR)
+
+
+def _backend_mtimes(ticker, backend):
+    """mtimes of every file the backend is built from (all member models and scalers for the ensemble)"""
+    if backend == 'ensemble':
+        from src.ensemble import member_files
+        paths = member_files(ticker)
+    else:
+        paths = [_backend_source(ticker, backend)]
+    return tuple(os.path.getmtime(path) if os.path.exists(path) else None for path in paths)
+
+
+def get_backend(ticker, backend=None):
+    """
+    Inference backend for a ticker, selected by `backend` or the
+    STOCK_INFERENCE_BACKEND environment variable. Instances are reused
+    until one of the underlying model files changes. Returns None if it cannot be loaded.
+    """
+    backend = backend or INFERENCE_BACKEND
+    source = _backend_source(ticker, backend)
+    mtimes = _backend_mtimes(ticker, backend)
+
+    with _backends_lock:
+        cached = _backends.get((backend, ticker))
+        if cached is not None and cached[0] == mtimes:
+            return cached[1]
+
+    try:
+        if backend == 'keras':
+            instance = KerasBackend(ticker)
+        elif backend == 'tflite':
+            instance = TFLiteBackend(source)
+        elif backend == 'numpy':
+            instance = NumpyBackend(source)
+        elif backend == 'ensemble':
+            from src.ensemble import EnsembleBackend
+            instance = EnsembleBackend(ticker)
+        else:
+            raise ValueError(f"Unknown inference backend '{backend}'")
+    except Exception as e:
+        print(f"❌ Could not load {backend} backend for {ticker}: {e}")
+        return None
+
+    with _backends_lock:
+        _backends[(backend, ticker)] = (mtimes, instance)
+    return instance
+
+
+def forecast_prices(ticker, x_input, scaler, days=7, backend=None, scheduler=None):
+    """
+    Forecast `days` closing prices for one window with the configured backend.
+    With an InferenceScheduler the window is batched with concurrent requests.
+    """
+    if scheduler is not None:
+        try:
+            with span('inference', ticker, backend=scheduler.backend, days=days, batched=True):
+                scaled = scheduler.forecast_scaled(ticker, x_input[0], days=days)
+                return scaler.inverse_transform(scaled.reshape(-1, 1)).flatten()
+        except Exception as e:
+            print(f"Error predicting next days: {str(e)}")
+            return None
+
+    with span('model_load', ticker, backend=backend or INFERENCE_BACKEND):
+        instance = get_backend(ticker, backend)
+    if instance is None:
+        return None
+    try:
+        with span('inference', ticker, backend=instance.name, days=days):
+            scaled = instance.forecast_scaled(x_input[:1], days=days)[0]
+            return scaler.inverse_transform(scaled.reshape(-1, 1)).flatten()
+    except Exception as e:
+        print(f"Error predicting next days: {str(e)}")
+        return None
+
+
+def forecast_price_quantiles(ticker, x_input, scaler, samples, days=7, quantiles=None):
+    """
+    Per-day price quantiles from `samples` Monte-Carlo dropout forecasts of one
+    window, as an array [len(quantiles), days]. Dropout only exists in the
+    Keras graph, so this always uses the keras backend.
+    """
+    from src.predict import DEFAULT_QUANTILES, forecast_quantiles
+
+    with span('model_load', ticker, backend='keras'):
+        instance = get_backend(ticker, 'keras')
+    if instance is None:
+        return None
+    try:
+        with span('inference', ticker, backend=instance.name, days=days, mc_samples=samples):
+            scaled = instance.forecast_samples_scaled(x_input[:1], samples, days=days)
+            prices = scaler.inverse_transform(scaled.reshape(-1, 1)).reshape(samples, days)
+            return forecast_quantiles(prices, quantiles or DEFAULT_QUANTILES)
+    except Exception as e:
+        print(f"Error forecasting quantiles: {str(e)}")
+        return None
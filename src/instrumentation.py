@@ -0,0 +1,169 @@
+import bisect
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+#---------------------------------
+# Structured Logging
+#---------------------------------
+
+logger = logging.getLogger('stock.pipeline')
+
+# Setting STOCK_LOG_LEVEL (e.g. INFO) prints one JSON line per finished span to stderr
+if os.environ.get('STOCK_LOG_LEVEL') and not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(_handler)
+    logger.setLevel(os.environ['STOCK_LOG_LEVEL'].upper())
+
+
+#---------------------------------
+# Latency Histograms
+#---------------------------------
+
+# Bucket upper bounds in milliseconds; the last bucket is open-ended
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with count, sum, min and max"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = None
+
+    def record(self, ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.min_ms = ms if self.min_ms is None else min(self.min_ms, ms)
+        self.max_ms = ms if self.max_ms is None else max(self.max_ms, ms)
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile (q in 0..100)"""
+        if not self.count:
+            return None
+        target = q / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target and n:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean_ms': self.total_ms / self.count if self.count else None,
+            'min_ms': self.min_ms,
+            'max_ms': self.max_ms,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'buckets': dict(zip([str(b) for b in BUCKETS_MS] + ['inf'], self.counts)),
+        }
+
+
+_histograms = {}   # (ticker, stage) -> LatencyHistogram
+_histograms_lock = threading.Lock()
+
+
+def latency_summary(ticker=None):
+    """{ticker: {stage: histogram summary}}, optionally for a single ticker"""
+    with _histograms_lock:
+        summary = {}
+        for (t, stage), histogram in _histograms.items():
+            if ticker is None or t == ticker:
+                summary.setdefault(t, {})[stage] = histogram.summary()
+        return summary
+
+
+def reset_histograms():
+    with _histograms_lock:
+        _histograms.clear()
+
+
+#---------------------------------
+# Spans
+#---------------------------------
+
+# Callbacks interested in spans finished in the current context (e.g. one Streamlit session)
+_listeners = contextvars.ContextVar('stock_span_listeners', default=())
+
+
+@contextmanager
+def span(stage, ticker=None, **fields):
+    """
+    Time a pipeline stage. On exit the duration goes into the (ticker, stage)
+    histogram, a JSON log line is emitted and the listeners registered with
+    `on_span_end` in this context are called.
+    """
+    start = time.perf_counter()
+    ok = True
+    try:
+        yield fields
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        ms = (time.perf_counter() - start) * 1000.0
+        with _histograms_lock:
+            histogram = _histograms.get((ticker or '-', stage))
+            if histogram is None:
+                histogram = _histograms[(ticker or '-', stage)] = LatencyHistogram()
+            histogram.record(ms)
+
+        record = {'event': 'span', 'stage': stage, 'ticker': ticker, 'ms': round(ms, 3), 'ok': ok, **fields}
+        logger.info(json.dumps(record, default=str))
+        for callback in _listeners.get():
+            callback(record)
+
+
+@contextmanager
+def on_span_end(callback):
+    """Call `callback(record)` for every span finished inside this block (same thread/context only)"""
+    token = _listeners.set(_listeners.get() + (callback,))
+    try:
+        yield
+    finally:
+        _listeners.reset(token)
+
+
+#---------------------------------
+# Stage Progress
+#---------------------------------
+
+PIPELINE_STAGES = ['download', 'clean', 'merge', 'scale', 'model_load', 'inference', 'render']
+
+
+class StageProgress:
+    """
+    Turn finished spans into a 0-100 progress value.
+    `update(percent)` is called whenever one of `stages` completes or is skipped.
+    """
+
+    def __init__(self, update, stages=PIPELINE_STAGES):
+        self.update = update
+        self.stages = list(stages)
+        self.done = set()
+
+    def _advance(self):
+        self.update(int(100 * len(self.done) / len(self.stages)))
+
+    def __call__(self, record):
+        if record['stage'] in self.stages and record['stage'] not in self.done:
+            self.done.add(record['stage'])
+            self._advance()
+
+    def skip(self, *stages):
+        """Count stages that will not run this time (e.g. no download needed) as complete"""
+        self.done.update(s for s in stages if s in self.stages)
+        self._advance()
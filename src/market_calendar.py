@@ -0,0 +1,75 @@
+from datetime import date, datetime
+
+import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar,
+    GoodFriday,
+    Holiday,
+    USLaborDay,
+    USMartinLutherKingJr,
+    USMemorialDay,
+    USPresidentsDay,
+    USThanksgivingDay,
+    nearest_workday,
+    sunday_to_monday,
+)
+from pandas.tseries.offsets import CustomBusinessDay
+
+
+#---------------------------------
+# NYSE Trading Calendar
+#---------------------------------
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    """Regular NYSE full-day holidays (one-off closures are not modelled)"""
+    rules = [
+        Holiday('NewYearsDay', month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-06-19', observance=nearest_workday),
+        Holiday('IndependenceDay', month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas', month=12, day=25, observance=nearest_workday),
+    ]
+
+
+TRADING_DAY = CustomBusinessDay(calendar=NYSEHolidayCalendar())
+
+
+def as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+def is_trading_day(day):
+    day = pd.Timestamp(as_date(day))
+    return TRADING_DAY.is_on_offset(day)
+
+
+def trading_days(start, end):
+    """Trading days between start and end, both inclusive"""
+    return pd.date_range(as_date(start), as_date(end), freq=TRADING_DAY)
+
+
+def next_trading_day(day):
+    return (pd.Timestamp(as_date(day)) + TRADING_DAY).date()
+
+
+def previous_trading_day(day):
+    return (pd.Timestamp(as_date(day)) - TRADING_DAY).date()
+
+
+def last_completed_trading_day(today=None):
+    """
+    Latest trading day whose daily bar is complete: the last trading day
+    strictly before `today`, so weekends and holidays map back to the
+    previous session.
+    """
+    today = as_date(today or datetime.today())
+    return previous_trading_day(today)
@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+#---------------------------------
+# Model Registry
+#---------------------------------
+
+MODEL_DIR = 'model'
+DEFAULT_MEMORY_BUDGET_MB = float(os.environ.get('STOCK_MODEL_MEMORY_MB', 512))
+
+
+def model_path_for(ticker, model_dir=MODEL_DIR):
+    """Path of the saved Keras model for a ticker"""
+    return os.path.join(model_dir, f"{ticker}_model.h5")
+
+
+def _load_keras_model(path):
+    # Imported here so that creating a registry does not pull in TensorFlow
+    from tensorflow.keras.models import load_model
+    return load_model(path)
+
+
+def _estimate_model_bytes(model, path):
+    """Approximate resident size of a loaded model (weights), falling back to file size"""
+    try:
+        return int(sum(w.nbytes for w in model.get_weights()))
+    except Exception:
+        return os.path.getsize(path)
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded models.
+
+    Each model file is loaded once and shared by every caller (and every
+    Streamlit session, since the module lives for the whole process).
+    Entries are evicted least-recently-used when the estimated memory use
+    goes over the budget, and reloaded when the file's mtime changes.
+    """
+
+    def __init__(self, model_dir=MODEL_DIR, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, loader=None):
+        self.model_dir = model_dir
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024)
+        self.loader = loader or _load_keras_model
+
+        self._entries = OrderedDict()   # path -> dict(model, mtime, size_bytes)
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'reloads': 0,
+            'evictions': 0,
+            'load_count': 0,
+            'load_time_total': 0.0,
+            'load_times': {},
+        }
+
+    def get(self, ticker, model_dir=None):
+        """Return the model for a ticker, loading it on first use. None if no model file exists."""
+        path = model_path_for(ticker, model_dir or self.model_dir)
+        return self.get_path(path, key=ticker)
+
+    def get_path(self, path, key=None):
+        """Return the model stored at `path`, loading it on first use"""
+        if not os.path.exists(path):
+            print(f"❌ Model not found at {path}")
+            return None
+
+        mtime = os.path.getmtime(path)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry['mtime'] == mtime:
+                self._entries.move_to_end(path)
+                self._stats['hits'] += 1
+                return entry['model']
+            load_lock = self._load_locks.setdefault(path, threading.Lock())
+
+        # Only one thread loads a given file; the others wait and then hit the cache
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(path)
+                if entry is not None and entry['mtime'] == mtime:
+                    self._entries.move_to_end(path)
+                    self._stats['hits'] += 1
+                    return entry['model']
+                is_reload = entry is not None
+
+            start = time.perf_counter()
+            model = self.loader(path)
+            elapsed = time.perf_counter() - start
+            size_bytes = _estimate_model_bytes(model, path)
+
+            with self._lock:
+                self._stats['misses'] += 1
+                self._stats['load_count'] += 1
+                self._stats['load_time_total'] += elapsed
+                self._stats['load_times'][key or path] = elapsed
+                if is_reload:
+                    self._stats['reloads'] += 1
+                    print(f"🔁 Model file changed, reloaded {path}")
+
+                self._entries[path] = {'model': model, 'mtime': mtime, 'size_bytes': size_bytes}
+                self._entries.move_to_end(path)
+                self._evict(keep=path)
+
+            print(f"✅ Loaded model from {path} in {elapsed:.2f}s")
+            return model
+
+    def _evict(self, keep=None):
+        """Drop least-recently-used models until the budget is respected (caller holds the lock)"""
+        while self._entries and self.memory_bytes() > self.memory_budget_bytes:
+            oldest = next(iter(self._entries))
+            if oldest == keep:
+                # Never evict the model we are about to hand out
+                break
+            del self._entries[oldest]
+            self._stats['evictions'] += 1
+            print(f"🗑️ Evicted model {oldest} from registry")
+
+    def memory_bytes(self):
+        return sum(entry['size_bytes'] for entry in self._entries.values())
+
+    def invalidate(self, ticker=None, model_dir=None):
+        """Forget one ticker's model, or every model when no ticker is given"""
+        with self._lock:
+            if ticker is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(model_path_for(ticker, model_dir or self.model_dir), None)
+
+    def stats(self):
+        """Snapshot of hit/miss counters, load times and memory use"""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **{k: v for k, v in self._stats.items() if k != 'load_times'},
+                'load_times': dict(self._stats['load_times']),
+                'hit_rate': self._stats['hits'] / lookups if lookups else 0.0,
+                'loaded': list(self._entries.keys()),
+                'memory_bytes': self.memory_bytes(),
+                'memory_budget_bytes': self.memory_budget_bytes,
+            }
+
+
+#---------------------------------
+# Shared Registry
+#---------------------------------
+
+_registry = ModelRegistry()
+
+
+def get_registry():
+    """The registry shared by the whole process"""
+    return _registry
+
+
+def get_model(ticker):
+    """Load (or reuse) the model for a ticker from the shared registry"""
+    return _registry.get(ticker)
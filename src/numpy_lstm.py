@@ -0,0 +1,233 @@
+import argparse
+import json
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+from src.model_registry import MODEL_DIR, model_path_for
+from src.storage import TICKERS
+
+
+#----------------------------------------
+# Read Keras Weights
+#----------------------------------------
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+def load_h5_layers(path):
+    """
+    Read a Sequential LSTM/Dense model saved by Keras as .h5 into a list of
+    layer dicts. Dropout layers are skipped (they are the identity at inference).
+    """
+    import h5py
+
+    with h5py.File(path, 'r') as f:
+        config = json.loads(_decode(f.attrs['model_config']))
+        weights = f['model_weights']
+
+        layers = []
+        for layer_config in config['config']['layers']:
+            kind = layer_config['class_name']
+            cfg = layer_config['config']
+            if kind in ('InputLayer', 'Dropout'):
+                continue
+
+            group = weights[cfg['name']]
+            arrays = [np.asarray(group[_decode(name)], dtype=np.float32) for name in group.attrs['weight_names']]
+
+            if kind == 'LSTM':
+                if cfg.get('activation') != 'tanh' or cfg.get('recurrent_activation') != 'sigmoid' or cfg.get('go_backwards'):
+                    raise ValueError(f"Unsupported LSTM configuration in {cfg['name']}")
+                kernel, recurrent_kernel = arrays[0], arrays[1]
+                bias = arrays[2] if cfg.get('use_bias', True) else np.zeros(kernel.shape[1], dtype=np.float32)
+                layers.append({
+                    'type': 'lstm',
+                    'units': int(cfg['units']),
+                    'return_sequences': bool(cfg.get('return_sequences')),
+                    'kernel': kernel,
+                    'recurrent_kernel': recurrent_kernel,
+                    'bias': bias,
+                })
+            elif kind == 'Dense':
+                if cfg.get('activation', 'linear') != 'linear':
+                    raise ValueError(f"Unsupported Dense activation in {cfg['name']}")
+                bias = arrays[1] if cfg.get('use_bias', True) else np.zeros(arrays[0].shape[1], dtype=np.float32)
+                layers.append({'type': 'dense', 'kernel': arrays[0], 'bias': bias})
+            else:
+                raise ValueError(f"Unsupported layer type {kind}")
+
+    return layers
+
+
+#----------------------------------------
+# NumPy Forward Pass
+#----------------------------------------
+
+# Workspaces kept per model, one per (batch size, window length); a batch of
+# 512 windows needs about 100MB, so only the most recently used shapes stay
+MAX_WORKSPACES = 4
+
+def _sigmoid_(x):
+    """In-place logistic sigmoid"""
+    with np.errstate(over='ignore'):
+        np.negative(x, out=x)
+        np.exp(x, out=x)
+    x += 1.0
+    np.reciprocal(x, out=x)
+
+
+class NumpyLSTMModel:
+    """
+    Stacked LSTM -> Dense forward pass in NumPy, using the weights of a Keras .h5 model.
+
+    Each LSTM layer projects all timesteps through its input kernel in one
+    matrix multiply, then runs the recurrence with in-place ops on buffers
+    that are allocated once per (batch size, window length) and reused.
+    """
+
+    def __init__(self, layers):
+        self.layers = layers
+        self._workspaces = OrderedDict()
+
+    @classmethod
+    def from_h5(cls, path):
+        return cls(load_h5_layers(path))
+
+    def _workspace(self, batch, time_step):
+        key = (batch, time_step)
+        ws = self._workspaces.get(key)
+        if ws is not None:
+            self._workspaces.move_to_end(key)
+        else:
+            ws = []
+            for layer in self.layers:
+                if layer['type'] == 'lstm':
+                    units = layer['units']
+                    ws.append({
+                        'xw': np.empty((batch, time_step, 4 * units), dtype=np.float32),
+                        'z': np.empty((batch, 4 * units), dtype=np.float32),
+                        'h': np.empty((batch, units), dtype=np.float32),
+                        'c': np.empty((batch, units), dtype=np.float32),
+                        'tmp': np.empty((batch, units), dtype=np.float32),
+                        'seq': np.empty((batch, time_step, units), dtype=np.float32) if layer['return_sequences'] else None,
+                    })
+                else:
+                    ws.append({'out': np.empty((batch, layer['kernel'].shape[1]), dtype=np.float32)})
+            self._workspaces[key] = ws
+            while len(self._workspaces) > MAX_WORKSPACES:
+                self._workspaces.popitem(last=False)
+        return ws
+
+    def _lstm(self, layer, ws, x):
+        units = layer['units']
+        xw, z, h, c, tmp, seq = ws['xw'], ws['z'], ws['h'], ws['c'], ws['tmp'], ws['seq']
+
+        # Input contribution for every timestep at once
+        np.matmul(x, layer['kernel'], out=xw)
+        xw += layer['bias']
+
+        h.fill(0.0)
+        c.fill(0.0)
+        i_gate, f_gate, g_gate, o_gate = z[:, :units], z[:, units:2 * units], z[:, 2 * units:3 * units], z[:, 3 * units:]
+
+        for t in range(x.shape[1]):
+            np.matmul(h, layer['recurrent_kernel'], out=z)
+            z += xw[:, t]
+            # Keras gate order: input, forget, cell candidate, output
+            _sigmoid_(z[:, :2 * units])
+            np.tanh(g_gate, out=g_gate)
+            _sigmoid_(o_gate)
+
+            c *= f_gate
+            np.multiply(i_gate, g_gate, out=tmp)
+            c += tmp
+            np.tanh(c, out=tmp)
+            np.multiply(o_gate, tmp, out=h)
+            if seq is not None:
+                seq[:, t] = h
+
+        return seq if seq is not None else h
+
+    def predict(self, windows):
+        """
+        One-step predictions for windows of shape [batch, time_step, features].
+        Returns an array of shape [batch, 1] (a view into a reused buffer).
+        """
+        x = np.asarray(windows, dtype=np.float32)
+        ws = self._workspace(x.shape[0], x.shape[1])
+        for layer, layer_ws in zip(self.layers, ws):
+            if layer['type'] == 'lstm':
+                x = self._lstm(layer, layer_ws, x)
+            else:
+                np.matmul(x, layer['kernel'], out=layer_ws['out'])
+                layer_ws['out'] += layer['bias']
+                x = layer_ws['out']
+        return x
+
+    def forecast(self, windows, days=7):
+        """
+        Autoregressive `days`-step forecast for a batch of single-feature windows
+        [batch, time_step, 1]. The sliding window lives in one preallocated
+        buffer, so each step only writes the new prediction.
+        Returns scaled predictions of shape [batch, days].
+        """
+        windows = np.asarray(windows, dtype=np.float32)
+        batch, time_step = windows.shape[0], windows.shape[1]
+
+        buffer = np.empty((batch, time_step + days, 1), dtype=np.float32)
+        buffer[:, :time_step] = windows
+        out = np.empty((batch, days), dtype=np.float32)
+
+        for day in range(days):
+            pred = self.predict(buffer[:, day:day + time_step])
+            buffer[:, time_step + day] = pred
+            out[:, day] = pred[:, 0]
+        return out
+
+
+#----------------------------------------
+# Parity Check
+#----------------------------------------
+
+def check_parity(ticker, days=7, tolerance=1e-3, model_dir=MODEL_DIR):
+    """
+    Compare the NumPy engine with predict_next_days_single_feature on the
+    ticker's latest window. Returns (ok, max_abs_diff) in price units.
+    """
+    from src.download_data import load_historical_data
+    from src.model_registry import get_registry
+    from src.predict import predict_next_days_single_feature
+    from src.preprocess import prepare_inference_window
+
+    df = load_historical_data(ticker)
+    x_input, scaler = prepare_inference_window(df, ticker)
+
+    expected = predict_next_days_single_feature(get_registry().get(ticker, model_dir), x_input, scaler, days=days)
+    engine = NumpyLSTMModel.from_h5(model_path_for(ticker, model_dir))
+    actual = scaler.inverse_transform(engine.forecast(x_input, days=days)[0].reshape(-1, 1)).flatten()
+
+    max_diff = float(np.abs(expected - actual).max())
+    return max_diff <= tolerance, max_diff
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the NumPy LSTM engine against the Keras models")
+    parser.add_argument('tickers', nargs='*', default=TICKERS, help="Tickers to check (default: all)")
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--tolerance', type=float, default=1e-3, help="Maximum allowed difference in USD")
+    args = parser.parse_args(argv)
+
+    failed = []
+    for ticker in args.tickers:
+        ok, max_diff = check_parity(ticker, args.days, args.tolerance)
+        print(f"{'✅' if ok else '❌'} {ticker}: max difference {max_diff:.2e} USD")
+        if not ok:
+            failed.append(ticker)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
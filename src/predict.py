@@ -1,3 +1,6 @@
+import os
+import weakref
+
 import numpy as np
 
 
@@ -28,45 +31,144 @@ def get_recommendation(predicted_prices, last_price):
 
 
 
+#----------------------------------------
+# Multi-Step Forecast Engine
+#-----------------------------------------
+
+# Compiled forecasters per loaded model ({training: forecaster}), dropped together with the model
+_forecasters = weakref.WeakKeyDictionary()
+
+
+def _build_forecaster(model, training=False):
+    """
+    Compile the whole autoregressive loop into a single TensorFlow graph.
+    With training=True the Dropout layers stay active, so every window in
+    the batch follows its own stochastic path.
+    The graph only holds a weak reference to the model, so the cache entry
+    (and the graph) goes away when the registry drops the model.
+    """
+    import tensorflow as tf
+
+    model_ref = weakref.ref(model)
+
+    @tf.function(reduce_retracing=True)
+    def forecast(window, days):
+        predictions = tf.TensorArray(tf.float32, size=days)
+        for i in tf.range(days):
+            # Next value for every window in the batch, shape [batch, 1]
+            current_pred = tf.cast(model_ref()(window, training=training), tf.float32)
+            predictions = predictions.write(i, current_pred[:, 0])
+            # Slide the window: drop the oldest step and append the prediction
+            window = tf.concat([window[:, 1:, :], current_pred[:, None, :]], axis=1)
+        return tf.transpose(predictions.stack())
+
+    return forecast
+
+
+def _run_forecaster(model, windows, days, training=False):
+    import tensorflow as tf
+
+    forecasters = _forecasters.setdefault(model, {})
+    forecaster = forecasters.get(training)
+    if forecaster is None:
+        forecaster = forecasters[training] = _build_forecaster(model, training)
+
+    window = tf.convert_to_tensor(np.asarray(windows, dtype=np.float32))
+    # The horizon is passed as a tensor so that changing it does not retrace the graph
+    return forecaster(window, tf.constant(int(days), dtype=tf.int32)).numpy()
+
+
+def forecast_scaled(model, x_input, days=7):
+    """
+    Run the full `days`-step autoregressive forecast in one compiled call.
+    `x_input` has shape [batch, time_step, 1]; returns scaled predictions of shape [batch, days].
+    """
+    return _run_forecaster(model, x_input, days)
+
+
+#----------------------------------------
+# Monte-Carlo Dropout
+#-----------------------------------------
+
+# Stochastic forward passes per uncertainty forecast
+MC_SAMPLES = int(os.environ.get('STOCK_MC_SAMPLES', '200'))
+# Lower bound, median and upper bound of the 90% band
+DEFAULT_QUANTILES = (0.05, 0.5, 0.95)
+
+
+def forecast_samples_scaled(model, x_input, samples=MC_SAMPLES, days=7):
+    """
+    `samples` stochastic forecasts of one window with dropout active
+    (Monte-Carlo dropout). The window is repeated into a [samples, time_step, 1]
+    batch and forecast in one compiled call, so each of the `days` steps is a
+    single batched model call. Returns scaled predictions of shape [samples, days].
+    """
+    windows = np.repeat(np.asarray(x_input[:1], dtype=np.float32), samples, axis=0)
+    return _run_forecaster(model, windows, days, training=True)
+
+
+def forecast_quantiles(samples, quantiles=DEFAULT_QUANTILES):
+    """Per-day quantiles of [samples, days] forecasts; returns an array of shape [len(quantiles), days]"""
+    return np.quantile(samples, quantiles, axis=0)
+
+
+#----------------------------------------
+# Predict Next Days Multi Feature
+#-----------------------------------------
+
+def predict_next_days_multi_feature(model, x_input, scaler, state, columns=None, days=7):
+    """
+    Multi-step forecast for a model trained on feature windows
+    [1, time_step, n_features] that predicts the next scaled Close.
+    Each prediction becomes a bar (Open/High/Low = Close, last Volume)
+    that `state` (src.features.IncrementalFeatures after the window's last
+    bar; it is advanced in place) turns into the next feature row, so no
+    indicator is recomputed over the history.
+    Returns the predicted closing prices.
+    """
+    from src.features import FEATURE_COLUMNS
+
+    columns = columns or FEATURE_COLUMNS
+    try:
+        close_index = columns.index('Close')
+        close_min, close_range = scaler.data_min_[close_index], scaler.data_range_[close_index]
+        last_volume = state.volumes[-1] if state.volumes else 0.0
+
+        window = np.array(x_input, dtype=np.float32)
+        predicted = []
+        for _ in range(days):
+            scaled_close = float(model(window, training=False).numpy()[0, 0])
+            close = scaled_close * close_range + close_min
+            predicted.append(close)
+
+            row = state.update({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': last_volume})
+            next_row = scaler.transform(np.array([[row[column] for column in columns]], dtype=np.float64))
+            window = np.concatenate([window[:, 1:], next_row[None].astype(np.float32)], axis=1)
+
+        return np.array(predicted)
+    except Exception as e:
+        print(f"Error predicting next days: {str(e)}")
+        return None
+
+
 #----------------------------------------
 # Predict Next Day Single Feature
 #-----------------------------------------
 
 def predict_next_days_single_feature(model, x_input, scaler, time_step=60, days=7):
     """
-    Predict stock prices for the next 7 days using a model trained on only the Close price.
+    Predict stock prices for the next `days` days (7 by default) using a model trained on only the Close price.
     """
     try:
-        # Array to store predictions
-        predicted_prices = []
-        
-        # Make a copy of the input data to avoid modifying the original
-        current_batch = x_input.copy()
-        
-        # Loop for each day we want to predict
-        for i in range(days):
-            # Make prediction for the current batch (shape will be [1, 1])
-            current_pred = model.predict(current_batch, verbose=0)
-            
-            # Store the prediction
-            predicted_prices.append(current_pred[0, 0])
-            
-            # Update the input sequence for the next prediction
-            # Remove the oldest data point and add the new prediction
-            new_point = np.array([[[current_pred[0, 0]]]])  # Shape: [1, 1, 1]
-            current_batch = np.append(current_batch[:, 1:, :], new_point, axis=1)
-        
+        # Scaled predictions for the single input window, shape [days]
+        predicted_prices = forecast_scaled(model, x_input[:1], days=days)[0]
+
         # Convert the scaled predictions back to original price scale
-        predicted_prices_array = np.array(predicted_prices).reshape(-1, 1)
+        predicted_prices_array = predicted_prices.reshape(-1, 1)
         unscaled_predictions = scaler.inverse_transform(predicted_prices_array)
-        
+
         # Return as a flat array
         return unscaled_predictions.flatten()
     except Exception as e:
         print(f"Error predicting next days: {str(e)}")
         return None
-
-
-
-
-
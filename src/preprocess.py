@@ -1,45 +1,96 @@
+import csv
+import numpy as np
 import pandas as pd
-from sklearn.preprocessing import MinMaxScaler
 import os
+from src.instrumentation import span
+from src.scalers import load_scaler
+from src.storage import (DEFAULT_INTERVAL, EXCHANGE_TZ, PRICE_COLUMNS, append_bars, bars_dir,
+                         check_interval, write_prices)
 
 #-----------------------------------
-# Preprocess Data
+# Read Price CSV
 #-----------------------------------
 
-def preprocess_data(file_path,ticker):
-    try:
-        # Load the raw data
-        df = pd.read_csv(file_path)
+# First cells of the extra header rows yfinance writes under the field names
+YF_HEADER_LABELS = ('Ticker', 'Date', 'Datetime')
 
-        # Drop first two/three rows if metadata is detected (e.g., ticker name)
-        try:
-            pd.to_datetime(df.iloc[2, 0])  # Try to parse third row as date
-            df = df.iloc[2:].copy()
-        except Exception:
-            df = df.iloc[3:].copy()
 
-        # Rename 'Price' to 'Date' if necessary
-        if 'Price' in df.columns:
-            df.rename(columns={'Price': 'Date'}, inplace=True)
+def read_price_csv(file_path):
+    """
+    Parse a price CSV in either layout we produce:
+    - yfinance: a 'Price,<fields>' row followed by 'Ticker,...' and
+      (optionally) 'Date,,,' or 'Datetime,,,' rows
+    - flat: 'Date,<fields>' or 'Datetime,<fields>', optionally after an
+      unnamed index column
+    The layout is decided from the header rows alone. The data rows are then
+    parsed in one pass with float columns, and the dates are converted as one array.
+    Returns a frame with a 'Date' column followed by the OHLCV columns present.
+    """
+    with open(file_path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        skip_rows = 1
+        if header[0] == 'Price':
+            for row in reader:
+                if not row or row[0] not in YF_HEADER_LABELS:
+                    break
+                skip_rows += 1
+            header = ['Date'] + header[1:]
+
+    names = ['Date' if name in ('Date', 'Datetime') else name for name in header]
+    if 'Date' not in names:
+        raise ValueError(f"No Date column in {file_path}")
+    columns = ['Date'] + [col for col in PRICE_COLUMNS if col in names]
+
+    df = pd.read_csv(
+        file_path,
+        skiprows=skip_rows,
+        header=None,
+        names=names,
+        usecols=columns,
+        dtype={col: 'float64' for col in columns[1:]},
+    )[columns]
+
+    dates = df['Date'].astype(str)
+    # Intraday timestamps carry a UTC offset that changes with daylight saving time
+    has_offset = dates.str.contains(r'[+-]\d{2}:\d{2}$|Z$', regex=True).any()
+    df['Date'] = pd.to_datetime(dates, format='ISO8601', errors='coerce', utc=has_offset)
+    if has_offset:
+        df['Date'] = df['Date'].dt.tz_convert(EXCHANGE_TZ).dt.tz_localize(None)
+    return df
 
-        # Expected clean column list
-        expected_cols = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
-        df = df[[col for col in expected_cols if col in df.columns]]
 
-        # Convert 'Date' to datetime format
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+#-----------------------------------
+# Preprocess Data
+#-----------------------------------
 
-        # Convert price-related columns to numeric
-        for col in ['Open', 'High', 'Low', 'Close', 'Volume']:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+def preprocess_data(file_path, ticker, interval=DEFAULT_INTERVAL):
+    """
+    Clean a downloaded CSV and store it. Daily bars are saved to
+    data/<TICKER>_clean.csv and the price store; intraday bars are
+    appended to the ticker's monthly partitions.
+    """
+    try:
+        check_interval(interval)
+
+        # Load the raw data with typed columns
+        df = read_price_csv(file_path)
 
         # Remove rows with missing or invalid values
         df.dropna(inplace=True)
+        if 'Volume' in df.columns:
+            df['Volume'] = df['Volume'].astype('int64')
+
+        if interval != '1d':
+            added = append_bars(ticker, df, interval)
+            print(f"✅ Stored {added} new {interval} bars for {ticker}")
+            return bars_dir(ticker, interval)
 
         # Save cleaned data
         os.makedirs('data', exist_ok=True)
         clean_file_path = os.path.join('data', f'{ticker}_clean.csv')
         df.to_csv(clean_file_path, index=False)
+        write_prices(ticker, df, 'recent')
 
         print(f"✅ Cleaned data saved to: {clean_file_path}")
         return clean_file_path
@@ -58,6 +109,8 @@ def prepare_data_for_single_feature_model(df, feature='Close', time_step=60):
     Prepare data for prediction using only the Close price feature.
     This is compatible with models trained on a single feature.
     """
+    from sklearn.preprocessing import MinMaxScaler
+
     try:
         # Extract only the Close prices as a numpy array
         data = df[feature].values.reshape(-1, 1)
@@ -76,5 +129,63 @@ def prepare_data_for_single_feature_model(df, feature='Close', time_step=60):
 
 
 
+#----------------------------------------
+# Prepare Multi Feature Window
+#----------------------------------------
+
+FEATURES_SCALER = 'features_scaler'
+
+
+def prepare_multi_feature_window(features, ticker, columns=None, time_step=60):
+    """
+    Scale the last `time_step` rows of a feature frame (see src.features)
+    with the ticker's saved features scaler, refitting on the full history
+    when there is none. Returns (x_input [1, time_step, n_features], scaler).
+    """
+    from src.features import FEATURE_COLUMNS
 
+    columns = columns or FEATURE_COLUMNS
+    try:
+        with span('scale', ticker, features=len(columns)):
+            scaler = load_scaler(ticker, name=FEATURES_SCALER)
+            if scaler is None:
+                from sklearn.preprocessing import MinMaxScaler
+
+                print(f"⚠️ No features scaler artefact for {ticker}, refitting on the full history")
+                scaler = MinMaxScaler(feature_range=(0, 1)).fit(features[columns].dropna().to_numpy(dtype=np.float64))
+
+            window = features[columns].to_numpy(dtype=np.float64)[-time_step:]
+            if len(window) < time_step or np.isnan(window).any():
+                raise ValueError(f"the last {time_step} rows are incomplete")
+            x_input = scaler.transform(window).reshape(1, time_step, len(columns))
+            return x_input, scaler
+    except Exception as e:
+        print(f"Error preparing features: {str(e)}")
+        return None, None
+
+
+#----------------------------------------
+# Prepare Inference Window
+#----------------------------------------
+
+def prepare_inference_window(df, ticker, feature='Close', time_step=60):
+    """
+    Scale only the last `time_step` values with the scaler saved next to the model.
+    Falls back to refitting on the full history when the ticker has no scaler artefact.
+    Returns (x_input, scaler).
+    """
+    try:
+        with span('scale', ticker):
+            scaler = load_scaler(ticker)
+            if scaler is None:
+                print(f"⚠️ No scaler artefact for {ticker}, refitting on the full history")
+                x_input, scaler, _ = prepare_data_for_single_feature_model(df, feature, time_step)
+                return x_input, scaler
+
+            window = df[feature].values[-time_step:].reshape(-1, 1)
+            x_input = scaler.transform(window).reshape(1, time_step, 1)
+            return x_input, scaler
+    except Exception as e:
+        print(f"Error preparing data: {str(e)}")
+        return None, None
 
@@ -0,0 +1,94 @@
+import os
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+from src.market_calendar import as_date
+from src.preprocess import read_price_csv
+from src.storage import DEFAULT_INTERVAL, check_interval, normalize_price_frame
+
+
+#---------------------------------
+# Price Providers
+#---------------------------------
+
+class PriceProvider:
+    """
+    Source of OHLCV bars.
+
+    `fetch` returns the `interval` bars ('1m', '5m', '1h' or '1d') for
+    `ticker` on the days `start` to `end` (both inclusive) as a frame in the
+    store layout (see `normalize_price_frame`).
+    """
+    name = 'base'
+
+    def fetch(self, ticker, start, end, interval=DEFAULT_INTERVAL):
+        raise NotImplementedError
+
+
+# How far back Yahoo Finance serves each intraday interval, in days
+YAHOO_MAX_LOOKBACK_DAYS = {'1m': 7, '5m': 60, '1h': 730}
+
+
+class YahooProvider(PriceProvider):
+    """Bars from Yahoo Finance"""
+    name = 'yahoo'
+
+    def fetch(self, ticker, start, end, interval=DEFAULT_INTERVAL):
+        import yfinance as yf
+
+        check_interval(interval)
+        start = as_date(start)
+        if interval in YAHOO_MAX_LOOKBACK_DAYS:
+            start = max(start, date.today() - timedelta(days=YAHOO_MAX_LOOKBACK_DAYS[interval] - 1))
+
+        # yfinance treats `end` as exclusive
+        stock_data = yf.download(
+            ticker,
+            start=start.strftime('%Y-%m-%d'),
+            end=(as_date(end) + timedelta(days=1)).strftime('%Y-%m-%d'),
+            interval=interval,
+            auto_adjust=False,
+            progress=False,
+        )
+        if isinstance(stock_data.columns, pd.MultiIndex):
+            # Single-ticker downloads come back as (field, ticker) columns
+            stock_data.columns = stock_data.columns.get_level_values(0)
+        if stock_data.empty:
+            return normalize_price_frame(pd.DataFrame(columns=['Date', 'Open', 'High', 'Low', 'Close', 'Volume']))
+        return normalize_price_frame(stock_data)
+
+
+class LocalFileProvider(PriceProvider):
+    """
+    Offline stand-in that serves bars from local files, e.g. a copy of
+    historical/ or data/. Files are looked up as `<directory>/<pattern>`,
+    where the pattern may use {ticker} and {interval}.
+    `latency` adds a delay (in seconds) to every fetch to mimic a remote source.
+    """
+    name = 'local'
+
+    def __init__(self, directory, pattern='{ticker}.csv', latency=0.0):
+        self.directory = directory
+        self.pattern = pattern
+        self.latency = latency
+
+    def _read(self, ticker, interval):
+        path = os.path.join(self.directory, self.pattern.format(ticker=ticker, interval=interval))
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        if path.endswith('.parquet'):
+            return normalize_price_frame(pd.read_parquet(path))
+        return normalize_price_frame(read_price_csv(path))
+
+    def fetch(self, ticker, start, end, interval=DEFAULT_INTERVAL):
+        if self.latency:
+            time.sleep(self.latency)
+        df = self._read(ticker, check_interval(interval))
+        # Every bar on the end day, whatever its time
+        end_time = pd.Timestamp(as_date(end)) + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+        return df.loc[pd.Timestamp(as_date(start)):end_time]
+
+
+DEFAULT_PROVIDER = YahooProvider()
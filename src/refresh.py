@@ -0,0 +1,127 @@
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.download_data import sync_ticker
+from src.providers import DEFAULT_PROVIDER, LocalFileProvider
+from src.storage import DEFAULT_INTERVAL, INTERVALS, STORE_DIR, TICKERS
+
+
+#---------------------------------
+# Rate Limiter
+#---------------------------------
+
+class RateLimiter:
+    """Allow at most `rate` calls per second across all threads sharing the limiter"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_time = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_time)
+            self._next_time = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class RateLimitedProvider:
+    """Wrap a provider so every fetch first waits for the rate limiter"""
+
+    def __init__(self, provider, limiter):
+        self.provider = provider
+        self.limiter = limiter
+        self.name = provider.name
+
+    def fetch(self, ticker, start, end, interval=DEFAULT_INTERVAL):
+        self.limiter.wait()
+        return self.provider.fetch(ticker, start, end, interval)
+
+
+#---------------------------------
+# Refresh Tickers
+#---------------------------------
+
+def refresh_ticker(ticker, provider, retries=3, backoff=1.0, interval=DEFAULT_INTERVAL, store_dir=STORE_DIR):
+    """Sync one ticker, retrying with exponential backoff; returns a summary dict"""
+    start = time.perf_counter()
+    added = None
+    attempts = 0
+
+    while attempts <= retries:
+        attempts += 1
+        added = sync_ticker(ticker, provider=provider, interval=interval, store_dir=store_dir)
+        if added is not None:
+            break
+        if attempts <= retries:
+            delay = backoff * 2 ** (attempts - 1)
+            print(f"🔁 Retrying {ticker} in {delay:.1f}s (attempt {attempts + 1}/{retries + 1})")
+            time.sleep(delay)
+
+    return {
+        'ticker': ticker,
+        'ok': added is not None,
+        'rows_added': added or 0,
+        'attempts': attempts,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def refresh_tickers(tickers=None, provider=None, max_workers=4, rate_limit=2.0, retries=3, backoff=1.0,
+                    interval=DEFAULT_INTERVAL, store_dir=STORE_DIR):
+    """
+    Update several tickers concurrently on a bounded thread pool.
+    `rate_limit` caps provider requests per second across all workers.
+    Returns one summary dict per ticker, in input order.
+    """
+    tickers = list(tickers or TICKERS)
+    provider = RateLimitedProvider(provider or DEFAULT_PROVIDER, RateLimiter(rate_limit))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(lambda t: refresh_ticker(t, provider, retries, backoff, interval, store_dir), tickers))
+
+
+def print_summary(summary, elapsed):
+    print("\n| Ticker | Status | Rows added | Attempts | Time (s) |")
+    print("| ------ | ------ | ---------- | -------- | -------- |")
+    for row in summary:
+        status = '✅' if row['ok'] else '❌'
+        print(f"| {row['ticker']} | {status} | {row['rows_added']} | {row['attempts']} | {row['seconds']:.2f} |")
+    print(f"\n⏱️ Refreshed {len(summary)} tickers in {elapsed:.2f}s")
+
+
+#---------------------------------
+# Command Line
+#---------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh price data for several tickers concurrently")
+    parser.add_argument('tickers', nargs='*', default=TICKERS, help="Tickers to refresh (default: all)")
+    parser.add_argument('--workers', type=int, default=4, help="Maximum concurrent downloads")
+    parser.add_argument('--rate-limit', type=float, default=2.0, help="Provider requests per second (0 = unlimited)")
+    parser.add_argument('--retries', type=int, default=3, help="Retries per ticker after a failed download")
+    parser.add_argument('--backoff', type=float, default=1.0, help="Initial retry delay in seconds")
+    parser.add_argument('--interval', default=DEFAULT_INTERVAL, choices=INTERVALS, help="Bar interval")
+    parser.add_argument('--local-dir', default=None, help="Serve bars from <dir>/<TICKER>.csv instead of Yahoo Finance")
+    parser.add_argument('--latency', type=float, default=0.0, help="Delay added to every local fetch, in seconds")
+    args = parser.parse_args(argv)
+
+    provider = LocalFileProvider(args.local_dir, latency=args.latency) if args.local_dir else None
+
+    start = time.perf_counter()
+    summary = refresh_tickers(args.tickers, provider, args.workers, args.rate_limit, args.retries, args.backoff,
+                              args.interval)
+    print_summary(summary, time.perf_counter() - start)
+
+    return 0 if all(row['ok'] for row in summary) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from src.model_registry import MODEL_DIR
+from src.storage import TICKERS, read_prices
+
+
+#---------------------------------
+# Scaler Artefacts
+#---------------------------------
+
+# path -> (mtime, scaler); artefacts are tiny, so every one read stays cached
+_loaded_scalers = {}
+
+
+def scaler_path(ticker, model_dir=MODEL_DIR, name='scaler'):
+    """Path of a scaler artefact saved next to a ticker's model ('scaler' or 'features_scaler')"""
+    return os.path.join(model_dir, f"{ticker}_{name}.json")
+
+
+def _scaler_from_params(data_min, data_max, feature_range=(0, 1)):
+    """Rebuild a fitted MinMaxScaler from its min/max (fitting on the two extremes is exact)"""
+    from sklearn.preprocessing import MinMaxScaler
+
+    scaler = MinMaxScaler(feature_range=tuple(feature_range))
+    scaler.fit(np.array([data_min, data_max], dtype=np.float64).reshape(2, -1))
+    return scaler
+
+
+def save_scaler(ticker, scaler, feature='Close', model_dir=MODEL_DIR, name='scaler'):
+    """Write a fitted MinMaxScaler's parameters next to the model; `feature` may be a list of columns"""
+    os.makedirs(model_dir, exist_ok=True)
+    path = scaler_path(ticker, model_dir, name)
+    params = {
+        'ticker': ticker,
+        'feature': feature,
+        'feature_range': list(scaler.feature_range),
+        'data_min': [float(v) for v in scaler.data_min_],
+        'data_max': [float(v) for v in scaler.data_max_],
+    }
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(params, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_scaler(ticker, model_dir=MODEL_DIR, name='scaler'):
+    """The scaler the ticker's model was trained with, or None when no artefact exists"""
+    path = scaler_path(ticker, model_dir, name)
+    if not os.path.exists(path):
+        return None
+
+    mtime = os.path.getmtime(path)
+    cached = _loaded_scalers.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with open(path) as f:
+        params = json.load(f)
+    scaler = _scaler_from_params(params['data_min'], params['data_max'], params.get('feature_range', (0, 1)))
+    _loaded_scalers[path] = (mtime, scaler)
+    return scaler
+
+
+def fit_scaler_from_history(ticker, feature='Close'):
+    """Fit the scaler the notebook used for training: MinMax over the full historical series"""
+    df = read_prices(ticker, 'historical')
+    if df is None or df.empty:
+        return None
+    values = df[feature].to_numpy(dtype=np.float64)
+    return _scaler_from_params([values.min()], [values.max()])
+
+
+#---------------------------------
+# Command Line
+#---------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export scaler artefacts next to the models")
+    parser.add_argument('tickers', nargs='*', default=TICKERS, help="Tickers to export (default: all)")
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    args = parser.parse_args(argv)
+
+    for ticker in args.tickers:
+        scaler = fit_scaler_from_history(ticker)
+        if scaler is None:
+            print(f"⚠️ No historical data for {ticker} (skip)")
+            continue
+        path = save_scaler(ticker, scaler, model_dir=args.model_dir)
+        print(f"✅ Saved scaler for {ticker} to {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
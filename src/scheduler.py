@@ -0,0 +1,260 @@
+import argparse
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from src.inference import INFERENCE_BACKEND, get_backend
+from src.instrumentation import LatencyHistogram
+from src.storage import TICKERS
+
+
+#---------------------------------
+# Micro-Batcher
+#---------------------------------
+
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_MAX_WAIT_MS = 5.0
+
+
+class MicroBatcher:
+    """
+    Collect single inputs submitted from many threads and run them through
+    `batch_fn` together. A batch is dispatched as soon as it holds
+    `max_batch_size` inputs or the oldest input has waited `max_wait_ms`.
+    `batch_fn` takes a stacked array [batch, ...] and returns one row per input.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._pending = []   # (input, future, enqueue time)
+        self._cond = threading.Condition()
+        self._closed = False
+
+        # Written by the batching thread, read by stats(); both hold _stats_lock
+        self.batch_sizes = Counter()
+        self.queue_time = LatencyHistogram()
+        self.batch_time = LatencyHistogram()
+        self._stats_lock = threading.Lock()
+
+        self._thread = threading.Thread(target=self._loop, daemon=True, name='micro-batcher')
+        self._thread.start()
+
+    def submit(self, item):
+        """Queue one input; returns a Future resolving to its row of the batch output"""
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._pending.append((item, future, time.perf_counter()))
+            if len(self._pending) >= self.max_batch_size or len(self._pending) == 1:
+                self._cond.notify()
+        return future
+
+    def __call__(self, item):
+        return self.submit(item).result()
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if not self._pending:
+                return None
+
+            # Wait for the batch to fill, but never longer than max_wait after the oldest input
+            deadline = self._pending[0][2] + self.max_wait
+            while len(self._pending) < self.max_batch_size and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            return batch
+
+    def _loop(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            start = time.perf_counter()
+            with self._stats_lock:
+                for _, _, enqueued in batch:
+                    self.queue_time.record((start - enqueued) * 1000.0)
+                self.batch_sizes[len(batch)] += 1
+
+            try:
+                outputs = self.batch_fn(np.stack([item for item, _, _ in batch]))
+                for (_, future, _), output in zip(batch, outputs):
+                    future.set_result(output)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+            with self._stats_lock:
+                self.batch_time.record((time.perf_counter() - start) * 1000.0)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def stats(self):
+        with self._stats_lock:
+            batch_sizes = dict(sorted(self.batch_sizes.items()))
+            queue_time = self.queue_time.summary()
+            batch_time = self.batch_time.summary()
+        batches = sum(batch_sizes.values())
+        items = sum(size * n for size, n in batch_sizes.items())
+        return {
+            'batches': batches,
+            'items': items,
+            'mean_batch_size': items / batches if batches else None,
+            'batch_sizes': batch_sizes,
+            'queue_time': queue_time,
+            'batch_time': batch_time,
+        }
+
+
+#---------------------------------
+# Inference Scheduler
+#---------------------------------
+
+class InferenceScheduler:
+    """
+    One MicroBatcher per (ticker, horizon) in front of the inference backends,
+    so concurrent forecasts for the same model run as one batched call.
+    """
+
+    def __init__(self, backend=None, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.backend = backend or INFERENCE_BACKEND
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._batchers = {}
+        self._lock = threading.Lock()
+
+    def _instance(self, ticker):
+        instance = get_backend(ticker, self.backend)
+        if instance is None:
+            raise FileNotFoundError(f"No {self.backend} model for {ticker}")
+        return instance
+
+    def _batcher(self, ticker, days):
+        with self._lock:
+            batcher = self._batchers.get((ticker, days))
+        if batcher is not None:
+            return batcher
+
+        # A cold model load happens outside the lock, so other tickers are not held up
+        self._instance(ticker)
+
+        def batch_fn(windows):
+            # get_backend is cached per model file mtime, so a retrained model is used from the next batch
+            return self._instance(ticker).forecast_scaled(windows, days=days)
+
+        with self._lock:
+            batcher = self._batchers.get((ticker, days))
+            if batcher is None:
+                batcher = self._batchers[(ticker, days)] = MicroBatcher(batch_fn, self.max_batch_size, self.max_wait_ms)
+            return batcher
+
+    def forecast_scaled(self, ticker, window, days=7):
+        """Scaled `days`-step forecast for one window [time_step, 1]; blocks until its batch has run"""
+        return self._batcher(ticker, days)(np.asarray(window, dtype=np.float32))
+
+    def stats(self):
+        with self._lock:
+            return {f"{ticker}:{days}": batcher.stats() for (ticker, days), batcher in self._batchers.items()}
+
+    def close(self):
+        with self._lock:
+            batchers, self._batchers = list(self._batchers.values()), {}
+        for batcher in batchers:
+            batcher.close()
+
+
+#---------------------------------
+# Synthetic Load Generator
+#---------------------------------
+
+def synthetic_windows(ticker, count, time_step=60, seed=0):
+    """`count` scaled windows [time_step, 1] drawn from the ticker's price history"""
+    from src.download_data import load_historical_data
+    from src.preprocess import prepare_inference_window
+
+    df = load_historical_data(ticker)
+    _, scaler = prepare_inference_window(df, ticker, time_step=time_step)
+    scaled = scaler.transform(df[['Close']].values).astype(np.float32)
+
+    starts = np.random.default_rng(seed).integers(0, len(scaled) - time_step, size=count)
+    return np.stack([scaled[s:s + time_step] for s in starts])
+
+
+def run_load(forecast_fn, windows, clients):
+    """
+    Send every window through `forecast_fn(window)` from `clients` threads.
+    Returns (elapsed seconds, per-request latency histogram).
+    """
+    latency = LatencyHistogram()
+    lock = threading.Lock()
+
+    def request(window):
+        start = time.perf_counter()
+        forecast_fn(window)
+        with lock:
+            latency.record((time.perf_counter() - start) * 1000.0)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(request, windows))
+    return time.perf_counter() - start, latency
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Synthetic load test of the micro-batching scheduler")
+    parser.add_argument('ticker', nargs='?', default=TICKERS[0])
+    parser.add_argument('--requests', type=int, default=256)
+    parser.add_argument('--clients', type=int, default=32, help="Concurrent callers")
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS)
+    parser.add_argument('--backend', default=None, help="keras, tflite, numpy or ensemble (default: STOCK_INFERENCE_BACKEND)")
+    args = parser.parse_args(argv)
+
+    windows = synthetic_windows(args.ticker, args.requests)
+    instance = get_backend(args.ticker, args.backend)
+    if instance is None:
+        return 1
+
+    # Warm up both paths (graph tracing, workspace allocation) before timing
+    instance.forecast_scaled(windows[:1], days=args.days)
+    instance.forecast_scaled(windows[:args.max_batch], days=args.days)
+
+    unbatched = lambda window: instance.forecast_scaled(window[None], days=args.days)
+    elapsed, latency = run_load(unbatched, windows, args.clients)
+    print(f"⏱️ Unbatched: {args.requests / elapsed:.1f} req/s, p50 {latency.percentile(50)} ms, p95 {latency.percentile(95)} ms")
+
+    scheduler = InferenceScheduler(args.backend, args.max_batch, args.max_wait_ms)
+    try:
+        batched = lambda window: scheduler.forecast_scaled(args.ticker, window, args.days)
+        elapsed, latency = run_load(batched, windows, args.clients)
+        print(f"⏱️ Batched:   {args.requests / elapsed:.1f} req/s, p50 {latency.percentile(50)} ms, p95 {latency.percentile(95)} ms")
+
+        stats = scheduler.stats()[f"{args.ticker}:{args.days}"]
+        print(f"📦 {stats['batches']} batches, mean size {stats['mean_batch_size']:.1f}, sizes {stats['batch_sizes']}")
+        print(f"⌛ Queue time p50 {stats['queue_time']['p50_ms']} ms, p95 {stats['queue_time']['p95_ms']} ms")
+    finally:
+        scheduler.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,232 @@
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from src.download_data import load_historical_data
+from src.forecast_cache import cached_forecast, get_forecast_cache
+from src.inference import INFERENCE_BACKEND, get_backend
+from src.instrumentation import latency_summary, on_span_end, span
+from src.model_registry import model_path_for
+from src.scalers import load_scaler
+from src.scheduler import DEFAULT_MAX_WAIT_MS, InferenceScheduler
+from src.storage import TICKERS
+
+
+#---------------------------------
+# Request Coalescing
+#---------------------------------
+
+class RequestCoalescer:
+    """
+    Run one job per key at a time on a shared executor. Callers asking for a
+    key that is already in flight get the pending future instead of a new job.
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._stats = {'submitted': 0, 'coalesced': 0}
+
+    def submit(self, key, fn, *args):
+        """Returns (future, coalesced)"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self._stats['coalesced'] += 1
+                return future, True
+            future = self.executor.submit(fn, *args)
+            self._inflight[key] = future
+            self._stats['submitted'] += 1
+
+        future.add_done_callback(lambda f: self._done(key, f))
+        return future, False
+
+    def _done(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, 'in_flight': len(self._inflight)}
+
+
+#---------------------------------
+# Forecast Service
+#---------------------------------
+
+MAX_HORIZON = 30
+
+
+class ForecastService:
+    """Forecasts served from resident models on a worker pool, with identical requests coalesced"""
+
+    def __init__(self, workers=4, backend=None, scheduler=None):
+        self.backend = backend or INFERENCE_BACKEND
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='forecast')
+        self.coalescer = RequestCoalescer(self.executor)
+        # Optional InferenceScheduler batching inference across concurrent requests
+        self.scheduler = scheduler
+
+    def warm(self, tickers=TICKERS):
+        """Load every model and scaler up front so the first requests don't pay for it"""
+        for ticker in tickers:
+            load_scaler(ticker)
+            if get_backend(ticker, self.backend) is not None:
+                print(f"✅ {ticker} model loaded ({self.backend})")
+
+    def _run(self, ticker, horizon):
+        stages = {}
+
+        def record(span_record):
+            stages[span_record['stage']] = span_record['ms']
+
+        start = time.perf_counter()
+        with on_span_end(record):
+            df = load_historical_data(ticker)
+            forecast = cached_forecast(ticker, df, days=horizon, backend=self.backend, scheduler=self.scheduler) if df is not None else None
+        return forecast, {'compute_ms': round((time.perf_counter() - start) * 1000.0, 3), 'stages': stages}
+
+    def forecast(self, ticker, horizon=7):
+        """Returns the response payload, or None when the forecast could not be made"""
+        start = time.perf_counter()
+        future, coalesced = self.coalescer.submit((ticker, horizon), self._run, ticker, horizon)
+        forecast, timing = future.result()
+        if forecast is None:
+            return None
+
+        rec, reason, _, _ = forecast['recommendation']
+        return {
+            'ticker': ticker,
+            'horizon': horizon,
+            'backend': self.backend,
+            'last_date': forecast['last_date'],
+            'last_price': forecast['last_price'],
+            'predicted_prices': forecast['predicted_prices'],
+            'recommendation': {'action': rec, 'reason': reason},
+            'ensemble': forecast.get('ensemble'),
+            'timing': {
+                **timing,
+                'total_ms': round((time.perf_counter() - start) * 1000.0, 3),
+                'coalesced': coalesced,
+                'cache_hit': 'inference' not in timing['stages'],
+            },
+        }
+
+    def stats(self):
+        return {
+            'backend': self.backend,
+            'requests': self.coalescer.stats(),
+            'forecast_cache': get_forecast_cache().stats(),
+            'batching': self.scheduler.stats() if self.scheduler is not None else None,
+            'latency': latency_summary(),
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+        if self.scheduler is not None:
+            self.scheduler.close()
+
+
+#---------------------------------
+# HTTP Handler
+#---------------------------------
+
+FORECAST_PATH = re.compile(r'^/forecast/([A-Za-z.\-]+)/?$')
+
+
+class ForecastHandler(BaseHTTPRequestHandler):
+    """GET /forecast/{ticker}?horizon=7, GET /stats and GET /health"""
+    service = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/health':
+            return self._send_json(200, {'status': 'ok'})
+        if url.path == '/stats':
+            return self._send_json(200, self.service.stats())
+
+        match = FORECAST_PATH.match(url.path)
+        if match is None:
+            return self._send_json(404, {'error': f"Unknown path {url.path}"})
+
+        ticker = match.group(1).upper()
+        if not os.path.exists(model_path_for(ticker)):
+            return self._send_json(404, {'error': f"No model for {ticker}"})
+
+        try:
+            horizon = int(parse_qs(url.query).get('horizon', ['7'])[0])
+        except ValueError:
+            horizon = 0
+        if not 1 <= horizon <= MAX_HORIZON:
+            return self._send_json(400, {'error': f"horizon must be an integer between 1 and {MAX_HORIZON}"})
+
+        try:
+            with span('request', ticker, horizon=horizon):
+                payload = self.service.forecast(ticker, horizon)
+        except Exception as e:
+            return self._send_json(500, {'error': str(e)})
+        if payload is None:
+            return self._send_json(500, {'error': f"Forecast failed for {ticker}"})
+        return self._send_json(200, payload)
+
+    def log_message(self, format, *args):
+        # Requests are already logged through the 'request' span
+        pass
+
+
+def make_server(host='127.0.0.1', port=8000, service=None):
+    handler = type('BoundForecastHandler', (ForecastHandler,), {'service': service or ForecastService()})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+#---------------------------------
+# Command Line
+#---------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve forecasts over HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=4, help="Forecasts computed in parallel")
+    parser.add_argument('--backend', default=None, help="keras, tflite, numpy or ensemble (default: STOCK_INFERENCE_BACKEND)")
+    parser.add_argument('--no-warm', action='store_true', help="Load models on first request instead of at startup")
+    parser.add_argument('--max-batch', type=int, default=0, help="Micro-batch inference up to this many windows (0 disables)")
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS, help="Longest a window waits for its batch to fill")
+    args = parser.parse_args(argv)
+
+    scheduler = InferenceScheduler(args.backend, args.max_batch, args.max_wait_ms) if args.max_batch > 1 else None
+    service = ForecastService(workers=args.workers, backend=args.backend, scheduler=scheduler)
+    if not args.no_warm:
+        service.warm()
+
+    server = make_server(args.host, args.port, service)
+    print(f"🚀 Serving forecasts on http://{args.host}:{args.port}/forecast/<ticker>?horizon=7")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
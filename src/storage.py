@@ -0,0 +1,284 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+#---------------------------------
+# Columnar Price Store
+#---------------------------------
+
+STORE_DIR = 'store'
+TICKERS = ['AAPL', 'GOOGL', 'MSFT', 'AMZN', 'META', 'TSLA']
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+PRICE_DTYPES = {'Open': np.float32, 'High': np.float32, 'Low': np.float32, 'Close': np.float32, 'Volume': np.int64}
+EXCHANGE_TZ = 'America/New_York'
+
+# Where each kind of data lived before the store existed
+CSV_SOURCES = {
+    'historical': os.path.join('historical', '{ticker}.csv'),
+    'recent': os.path.join('data', '{ticker}_clean.csv'),
+}
+
+
+def store_path(ticker, kind, store_dir=STORE_DIR):
+    """Path of the Parquet file holding one kind ('historical' or 'recent') of prices for a ticker"""
+    return os.path.join(store_dir, f"{ticker}_{kind}.parquet")
+
+
+def _has_utc_offset(index):
+    """True for timestamp strings carrying a UTC offset (e.g. '2025-01-02 09:30:00-05:00')"""
+    if index.dtype != object or not len(index):
+        return False
+    first = str(index[0])
+    return len(first) > 10 and ('+' in first[10:] or '-' in first[10:] or first.endswith('Z'))
+
+
+def normalize_price_frame(df):
+    """
+    Bring a raw price frame into the store layout: a sorted, unique
+    DatetimeIndex named 'Date' and typed OHLCV columns.
+    """
+    df = df.rename(columns=lambda x: str(x).strip().capitalize()).rename(columns={'Datetime': 'Date'})
+    if 'Date' in df.columns:
+        df = df.set_index('Date')
+    df = df[PRICE_COLUMNS].copy()
+    index = pd.to_datetime(df.index, errors='coerce', utc=_has_utc_offset(df.index))
+    # Timestamps are stored as naive exchange (New York) time
+    df.index = index.tz_convert(EXCHANGE_TZ).tz_localize(None) if index.tz is not None else index
+    df.index.name = 'Date'
+
+    for col in PRICE_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    df = df[df.index.notna()].dropna()
+    df = df.astype(PRICE_DTYPES)
+
+    df = df[~df.index.duplicated(keep='first')]
+    return df.sort_index()
+
+
+# Callbacks run with (ticker, kind) after new prices are written
+_write_listeners = []
+
+
+def on_prices_written(callback):
+    """Register a callback(ticker, kind) to run whenever prices land in the store"""
+    _write_listeners.append(callback)
+    return callback
+
+
+def write_prices(ticker, df, kind, store_dir=STORE_DIR):
+    """Atomically write a ticker's prices to the store"""
+    os.makedirs(store_dir, exist_ok=True)
+    path = store_path(ticker, kind, store_dir)
+    tmp_path = path + '.tmp'
+    normalize_price_frame(df).to_parquet(tmp_path)
+    os.replace(tmp_path, path)
+
+    for callback in _write_listeners:
+        callback(ticker, kind)
+    return path
+
+
+def _read_csv_source(ticker, kind):
+    """Read the legacy CSV for a ticker, or None when it does not exist"""
+    csv_path = CSV_SOURCES[kind].format(ticker=ticker)
+    if not os.path.exists(csv_path):
+        return None
+    return normalize_price_frame(pd.read_csv(csv_path))
+
+
+def source_path(ticker, kind, store_dir=STORE_DIR):
+    """File `read_prices` would read for this ticker and kind, or None if there is none"""
+    path = store_path(ticker, kind, store_dir)
+    if os.path.exists(path):
+        return path
+    csv_path = CSV_SOURCES[kind].format(ticker=ticker)
+    return csv_path if os.path.exists(csv_path) else None
+
+
+def read_prices(ticker, kind, store_dir=STORE_DIR):
+    """
+    Read one kind of prices for a ticker, indexed by Date.
+    Falls back to parsing the legacy CSV when the ticker has not been
+    migrated yet; reading never writes anything.
+    """
+    path = store_path(ticker, kind, store_dir)
+    if os.path.exists(path):
+        return pd.read_parquet(path)
+    return _read_csv_source(ticker, kind)
+
+
+def read_combined(ticker, store_dir=STORE_DIR):
+    """Historical and recent prices merged into one frame, or None when neither exists"""
+    frames = [df for df in (read_prices(ticker, kind, store_dir) for kind in ('historical', 'recent')) if df is not None]
+    if not frames:
+        return None
+
+    combined = pd.concat(frames)
+    combined = combined[~combined.index.duplicated(keep='first')]
+    return combined.sort_index()
+
+
+def append_prices(ticker, new_df, kind='recent', store_dir=STORE_DIR):
+    """
+    Append bars after the last stored date and atomically rewrite the file.
+    Returns the number of rows added.
+    """
+    existing = read_prices(ticker, kind, store_dir)
+    new_df = normalize_price_frame(new_df)
+    if existing is not None and not existing.empty:
+        new_df = new_df[new_df.index > existing.index.max()]
+        if new_df.empty:
+            return 0
+        new_df = pd.concat([existing, new_df])
+    write_prices(ticker, new_df, kind, store_dir)
+    return len(new_df) - (0 if existing is None else len(existing))
+
+
+def last_stored_date(ticker, kind='recent', store_dir=STORE_DIR):
+    """Date of the latest bar stored for a ticker, or None"""
+    df = read_prices(ticker, kind, store_dir)
+    if df is None or df.empty:
+        return None
+    return df.index.max().date()
+
+
+#---------------------------------
+# Intraday Bars
+#---------------------------------
+
+INTERVALS = ['1m', '5m', '1h', '1d']
+DEFAULT_INTERVAL = '1d'
+BARS_DIR = 'bars'
+
+
+def check_interval(interval):
+    if interval not in INTERVALS:
+        raise ValueError(f"Unsupported interval '{interval}', expected one of {', '.join(INTERVALS)}")
+    return interval
+
+
+def bars_dir(ticker, interval, store_dir=STORE_DIR):
+    """store/bars/interval=<interval>/ticker=<TICKER>, holding one Parquet file per month"""
+    return os.path.join(store_dir, BARS_DIR, f"interval={interval}", f"ticker={ticker}")
+
+
+def _partition_files(ticker, interval, store_dir=STORE_DIR):
+    """{'YYYY-MM': path} for every stored month, in date order"""
+    directory = bars_dir(ticker, interval, store_dir)
+    if not os.path.isdir(directory):
+        return {}
+    names = sorted(name for name in os.listdir(directory) if name.startswith('month=') and name.endswith('.parquet'))
+    return {name[len('month='):-len('.parquet')]: os.path.join(directory, name) for name in names}
+
+
+def write_bars(ticker, df, interval, store_dir=STORE_DIR):
+    """
+    Write bars into their monthly partitions, atomically replacing each month
+    that `df` covers. Daily bars go to the regular 'recent' file instead.
+    """
+    if check_interval(interval) == '1d':
+        return write_prices(ticker, df, 'recent', store_dir)
+
+    df = normalize_price_frame(df)
+    directory = bars_dir(ticker, interval, store_dir)
+    os.makedirs(directory, exist_ok=True)
+    for month, part in df.groupby(df.index.strftime('%Y-%m'), sort=False):
+        path = os.path.join(directory, f"month={month}.parquet")
+        tmp_path = path + '.tmp'
+        part.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+
+    for callback in _write_listeners:
+        callback(ticker, interval)
+    return directory
+
+
+def read_bars(ticker, interval=DEFAULT_INTERVAL, start=None, end=None, store_dir=STORE_DIR):
+    """
+    Bars for a ticker between `start` and `end` (inclusive timestamps), or None.
+    Only the monthly partitions overlapping the range are read.
+    """
+    if check_interval(interval) == '1d':
+        df = read_combined(ticker, store_dir)
+    else:
+        first = pd.Timestamp(start).strftime('%Y-%m') if start is not None else None
+        last = pd.Timestamp(end).strftime('%Y-%m') if end is not None else None
+        paths = [path for month, path in _partition_files(ticker, interval, store_dir).items()
+                 if (first is None or month >= first) and (last is None or month <= last)]
+        df = pd.concat([pd.read_parquet(path) for path in paths]) if paths else None
+
+    if df is None:
+        return None
+    return df.loc[pd.Timestamp(start) if start is not None else None:pd.Timestamp(end) if end is not None else None]
+
+
+def last_bar_time(ticker, interval, store_dir=STORE_DIR):
+    """Timestamp of the latest stored bar, or None"""
+    if check_interval(interval) == '1d':
+        last = last_stored_date(ticker, 'recent', store_dir)
+        return pd.Timestamp(last) if last is not None else None
+
+    files = _partition_files(ticker, interval, store_dir)
+    if not files:
+        return None
+    return pd.read_parquet(files[max(files)], columns=['Close']).index.max()
+
+
+def append_bars(ticker, new_df, interval, store_dir=STORE_DIR):
+    """
+    Append bars newer than the last stored one. Only the partitions that
+    receive bars are rewritten. Returns the number of rows added.
+    """
+    if check_interval(interval) == '1d':
+        return append_prices(ticker, new_df, 'recent', store_dir)
+
+    new_df = normalize_price_frame(new_df)
+    last = last_bar_time(ticker, interval, store_dir)
+    if last is not None:
+        new_df = new_df[new_df.index > last]
+    if new_df.empty:
+        return 0
+
+    files = _partition_files(ticker, interval, store_dir)
+    parts = []
+    for month in new_df.index.strftime('%Y-%m').unique():
+        if month in files:
+            parts.append(pd.read_parquet(files[month]))
+    write_bars(ticker, pd.concat(parts + [new_df]) if parts else new_df, interval, store_dir)
+    return len(new_df)
+
+
+#---------------------------------
+# Migrate CSV Files
+#---------------------------------
+
+def migrate_csvs(tickers, store_dir=STORE_DIR):
+    """One-time conversion of historical/<T>.csv and data/<T>_clean.csv into the store"""
+    for ticker in tickers:
+        for kind in CSV_SOURCES:
+            df = _read_csv_source(ticker, kind)
+            if df is None:
+                print(f"⚠️ No {kind} CSV for {ticker} (skip)")
+                continue
+            path = write_prices(ticker, df, kind, store_dir)
+            print(f"✅ Migrated {kind} data for {ticker} to {path} ({len(df)} rows)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the columnar price store")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    migrate = subparsers.add_parser('migrate', help="Convert the existing CSV files into the store")
+    migrate.add_argument('tickers', nargs='*', default=TICKERS)
+    args = parser.parse_args(argv)
+
+    if args.command == 'migrate':
+        migrate_csvs(args.tickers)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,194 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from src.model_registry import MODEL_DIR, model_path_for
+from src.storage import TICKERS, read_combined, read_prices
+from src.window_dataset import WindowDataset, write_series
+from src.workers import pinned_process_pool
+
+
+#----------------------------------------
+# Build Model
+#----------------------------------------
+
+def build_model(input_shape):
+    """LSTM(100) -> LSTM(100) -> LSTM(50) -> Dense(1), as in notebooks/historical_model.ipynb"""
+    from tensorflow.keras.layers import LSTM, Dense, Dropout
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.optimizers import Adam
+
+    model = Sequential()
+
+    # Adding LSTM layers with Dropout
+    model.add(LSTM(units=100, return_sequences=True, input_shape=input_shape))
+    model.add(Dropout(0.2))
+
+    model.add(LSTM(units=100, return_sequences=True))
+    model.add(Dropout(0.2))
+
+    model.add(LSTM(units=50))
+    model.add(Dropout(0.2))
+
+    # Dense layer to output a single value
+    model.add(Dense(1))
+
+    model.compile(optimizer=Adam(learning_rate=0.001), loss='mean_squared_error')
+    return model
+
+
+#----------------------------------------
+# Train One Ticker
+#----------------------------------------
+
+def load_training_series(ticker, include_recent=False, feature='Close'):
+    """Closing prices the model is trained on: the historical file, optionally with recent bars"""
+    df = read_combined(ticker) if include_recent else read_prices(ticker, 'historical')
+    if df is None or df.empty:
+        return None
+    return df[feature].to_numpy(dtype=np.float32)
+
+
+def train_ticker(ticker, output_dir=MODEL_DIR, time_step=60, epochs=50, batch_size=32,
+                 val_split=0.2, patience=10, include_recent=False):
+    """
+    Train, evaluate and save the model and scaler for one ticker.
+    Returns the validation metrics as a dict, or None when there is no data.
+    """
+    import tensorflow as tf
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+    from sklearn.preprocessing import MinMaxScaler
+    from src.scalers import save_scaler
+
+    start = time.perf_counter()
+    prices = load_training_series(ticker, include_recent)
+    if prices is None or len(prices) <= time_step + 1:
+        print(f"❌ Not enough data to train {ticker}")
+        return None
+
+    # Normalize the data using MinMaxScaler (fit on the full series, as in the notebook)
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    scaled = write_series(ticker, scaler.fit_transform(prices.reshape(-1, 1)), 'train',
+                          meta={'rows': len(prices), 'include_recent': include_recent})
+
+    # Chronological split of the targets: first 80% train, last 20% validation
+    n_samples = len(scaled) - time_step
+    split = time_step + int(n_samples * (1 - val_split))
+    train_set = WindowDataset({ticker: scaled}, time_step, ranges={ticker: (time_step, split)})
+    val_set = WindowDataset({ticker: scaled}, time_step, ranges={ticker: (split, None)})
+    train_ds = train_set.to_tf_dataset(batch_size, shuffle=True, seed=42)
+    val_ds = val_set.to_tf_dataset(batch_size)
+
+    model = build_model((time_step, 1))
+    early_stopping = tf.keras.callbacks.EarlyStopping(monitor='val_loss', patience=patience, restore_best_weights=True)
+    model.fit(train_ds, validation_data=val_ds, epochs=epochs, callbacks=[early_stopping], verbose=2)
+
+    # Evaluate on the validation windows in the original price scale
+    val_loss = float(model.evaluate(val_ds, verbose=0))
+    X_val, y_val = val_set.take(np.arange(len(val_set)))
+    y_pred = scaler.inverse_transform(model.predict(X_val, batch_size=1024, verbose=0))
+    y_true = scaler.inverse_transform(y_val.reshape(-1, 1))
+    mse = float(mean_squared_error(y_true, y_pred))
+
+    os.makedirs(output_dir, exist_ok=True)
+    model.save(model_path_for(ticker, output_dir))
+    save_scaler(ticker, scaler, model_dir=output_dir)
+
+    metrics = {
+        'ticker': ticker,
+        'val_loss': val_loss,
+        'mse': mse,
+        'rmse': float(np.sqrt(mse)),
+        'mae': float(mean_absolute_error(y_true, y_pred)),
+        'r2': float(r2_score(y_true, y_pred)),
+        'epochs': len(model.history.history['loss']) if model.history else epochs,
+        'train_samples': split - time_step,
+        'val_samples': len(scaled) - split,
+        'seconds': time.perf_counter() - start,
+    }
+    print(f"✅ Trained {ticker}: RMSE {metrics['rmse']:.2f}, R² {metrics['r2']:.4f}")
+    return metrics
+
+
+#----------------------------------------
+# Parallel Training
+#----------------------------------------
+
+def _train_task(kwargs):
+    return train_ticker(**kwargs)
+
+
+def train_tickers(tickers=None, workers=1, **train_kwargs):
+    """Train several tickers, in parallel processes when workers > 1. Returns {ticker: metrics}."""
+    tickers = list(tickers or TICKERS)
+    tasks = [dict(ticker=ticker, **train_kwargs) for ticker in tickers]
+
+    if workers <= 1:
+        return {task['ticker']: train_ticker(**task) for task in tasks}
+
+    # Each training process gets its own CPUs
+    with pinned_process_pool(workers) as pool:
+        return dict(zip(tickers, pool.map(_train_task, tasks)))
+
+
+#----------------------------------------
+# Write Metrics
+#----------------------------------------
+
+def write_metrics(results, json_path, table_path='result.txt'):
+    """Save metrics as JSON and as the markdown table kept in result.txt"""
+    with open(json_path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    lines = [
+        "| Ticker    | Val Loss | MSE    | RMSE  | MAE  | R² Score |",
+        "| --------- | -------- | ------ | ----- | ---- | -------- |",
+    ]
+    for ticker, m in results.items():
+        if m is None:
+            continue
+        lines.append(f"| **{ticker}** | {m['val_loss']:.5f} | {m['mse']:.2f} | {m['rmse']:.2f} | {m['mae']:.2f} | {m['r2']:.4f} |")
+    with open(table_path, 'w') as f:
+        f.write("\n".join(lines) + "\n")
+
+
+#----------------------------------------
+# Command Line
+#----------------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the per-ticker LSTM models")
+    parser.add_argument('tickers', nargs='*', default=TICKERS, help="Tickers to train (default: all)")
+    parser.add_argument('--workers', type=int, default=1, help="Tickers trained in parallel processes")
+    parser.add_argument('--output-dir', default=MODEL_DIR, help="Where models, scalers and metrics are written")
+    parser.add_argument('--epochs', type=int, default=50)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--time-step', type=int, default=60)
+    parser.add_argument('--patience', type=int, default=10)
+    parser.add_argument('--include-recent', action='store_true', help="Also train on data/ bars after the historical file")
+    parser.add_argument('--result-table', default='result.txt', help="Markdown metrics table to (re)write")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = train_tickers(
+        args.tickers,
+        workers=args.workers,
+        output_dir=args.output_dir,
+        time_step=args.time_step,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        patience=args.patience,
+        include_recent=args.include_recent,
+    )
+    write_metrics(results, os.path.join(args.output_dir, 'metrics.json'), args.result_table)
+    print(f"⏱️ Trained {len(results)} tickers in {time.perf_counter() - start:.1f}s")
+
+    return 0 if all(results.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
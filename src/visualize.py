@@ -1,13 +1,17 @@
 from datetime import datetime, date, timedelta
-import matplotlib.pyplot as plt
 import pandas as pd
-import plotly.graph_objects as go
-import streamlit as st
+from src.chart_data import DEFAULT_MAX_POINTS, bounded_chart_frame
+from src.features import moving_average
+
+# plotly and streamlit are imported inside the functions that use them,
+# so importing this module (e.g. for calculate_stats) stays cheap
 
 #------------------------------------
 # Load CSS
 #------------------------------------
 def load_css():
+    import streamlit as st
+
     with open('style.css', 'r') as f:
         st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
 
@@ -16,8 +20,11 @@ def load_css():
 #----------------------------------------
 # Create Prediction Chart
 #----------------------------------------
-def create_prediction_chart(historical_data, predicted_prices):
-    """Create an interactive chart with historical and predicted prices"""
+def create_prediction_chart(historical_data, predicted_prices, quantiles=None):
+    """Create an interactive chart with historical and predicted prices.
+    `quantiles` ({quantile: prices}, e.g. from Monte-Carlo dropout) adds a band between the outer quantiles."""
+    import plotly.graph_objects as go
+
     # Get the last date from historical data
     last_date = historical_data['Date'].iloc[-1]
     
@@ -49,6 +56,28 @@ def create_prediction_chart(historical_data, predicted_prices):
         line=dict(color='#3b82f6', width=2)
     ))
     
+    # Add the uncertainty band (upper edge first, the lower edge fills up to it)
+    if quantiles:
+        levels = sorted(quantiles, key=float)
+        low, high = levels[0], levels[-1]
+        fig.add_trace(go.Scatter(
+            x=pred_df['Date'],
+            y=quantiles[high],
+            mode='lines',
+            line=dict(width=0),
+            showlegend=False,
+            name=f'{float(high):.0%} quantile'
+        ))
+        fig.add_trace(go.Scatter(
+            x=pred_df['Date'],
+            y=quantiles[low],
+            mode='lines',
+            line=dict(width=0),
+            fill='tonexty',
+            fillcolor='rgba(16, 185, 129, 0.15)',
+            name=f'{float(high) - float(low):.0%} interval'
+        ))
+
     # Add predicted data trace
     fig.add_trace(go.Scatter(
         x=pred_df['Date'],
@@ -114,8 +143,16 @@ def create_prediction_table(predicted_prices):
 # Create Price Chart
 #----------------------------------------
 
-def create_price_chart(df):
-    """Create a simple line chart for stock price with volume as bars"""
+def create_price_chart(df, max_points=DEFAULT_MAX_POINTS):
+    """Create a simple line chart for stock price with volume as bars.
+    Frames longer than max_points are downsampled (see src.chart_data)."""
+    import plotly.graph_objects as go
+
+    # Moving averages come from the full-resolution rows (precomputed columns from src.features are used when present)
+    if 'MA5' not in df.columns or 'MA20' not in df.columns:
+        df = df.assign(MA5=moving_average(df['Close'].to_numpy(), 5), MA20=moving_average(df['Close'].to_numpy(), 20))
+    df = bounded_chart_frame(df, 'all', max_points)
+
     # Create figure
     fig = go.Figure()
     
@@ -131,9 +168,6 @@ def create_price_chart(df):
     )
     
     # Add moving averages
-    df['MA5'] = df['Close'].rolling(window=5).mean()
-    df['MA20'] = df['Close'].rolling(window=20).mean()
-    
     fig.add_trace(
         go.Scatter(
             x=df['Date'],
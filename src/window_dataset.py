@@ -0,0 +1,158 @@
+import json
+import os
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+#---------------------------------
+# Memory-Mapped Series
+#---------------------------------
+
+SERIES_DIR = os.path.join('cache', 'series')
+
+
+def series_path(ticker, kind, series_dir=SERIES_DIR):
+    """cache/series/<TICKER>_<kind>.npy, e.g. kind 'train' or 'history'"""
+    return os.path.join(series_dir, f"{ticker}_{kind}.npy")
+
+
+def _meta_path(ticker, kind, series_dir):
+    return os.path.join(series_dir, f"{ticker}_{kind}.json")
+
+
+def write_series(ticker, values, kind, series_dir=SERIES_DIR, meta=None):
+    """
+    Store a scaled series once as float32 .npy (plus a JSON sidecar with `meta`)
+    and return it opened as a read-only memory map.
+    """
+    os.makedirs(series_dir, exist_ok=True)
+    path = series_path(ticker, kind, series_dir)
+    tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+    np.save(tmp_path, np.ascontiguousarray(values, dtype=np.float32).ravel())
+    os.replace(tmp_path, path)
+
+    with open(_meta_path(ticker, kind, series_dir), 'w') as f:
+        json.dump(meta or {}, f)
+    return open_series(ticker, kind, series_dir)
+
+
+def open_series(ticker, kind, series_dir=SERIES_DIR):
+    """Memory-mapped series written by write_series, or None if there is none"""
+    path = series_path(ticker, kind, series_dir)
+    if not os.path.exists(path):
+        return None
+    return np.load(path, mmap_mode='r')
+
+
+def series_meta(ticker, kind, series_dir=SERIES_DIR):
+    path = _meta_path(ticker, kind, series_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def cached_series(ticker, kind, meta, compute, series_dir=SERIES_DIR):
+    """
+    Memory-mapped series stored with the same `meta` (JSON-serialisable),
+    or the result of `compute()` written and mapped in its place.
+    """
+    if series_meta(ticker, kind, series_dir) == json.loads(json.dumps(meta)):
+        series = open_series(ticker, kind, series_dir)
+        if series is not None:
+            return series
+    return write_series(ticker, compute(), kind, series_dir, meta)
+
+
+#---------------------------------
+# Window Dataset
+#---------------------------------
+
+class WindowDataset:
+    """
+    (window, targets) samples over one or more series without materialising
+    the windows. Sample (ticker, t) is the window series[t - time_step : t]
+    and the targets series[t : t + horizon]. Each series is kept once (usually
+    a memory map) and windows are strided views into it; only the windows of
+    a requested batch are ever copied.
+
+    `series` maps a name (ticker) to a 1-D array. `ranges` optionally limits
+    each name to targets starting in [start, stop).
+    """
+
+    def __init__(self, series, time_step=60, horizon=1, ranges=None, step=1):
+        self.time_step = time_step
+        self.horizon = horizon
+        self.names = list(series)
+        self._views = []
+        ids, targets = [], []
+
+        for i, name in enumerate(self.names):
+            values = series[name]
+            # One strided view per series: row k covers series[k : k + time_step + horizon]
+            self._views.append(sliding_window_view(values, time_step + horizon))
+
+            start, stop = (ranges or {}).get(name, (None, None))
+            start = time_step if start is None else max(start, time_step)
+            stop = len(values) - horizon + 1 if stop is None else min(stop, len(values) - horizon + 1)
+            t = np.arange(start, stop, step, dtype=np.int64)
+            ids.append(np.full(len(t), i, dtype=np.int32))
+            targets.append(t)
+
+        # The whole index is 12 bytes per sample, whatever the window length
+        self._ids = np.concatenate(ids) if ids else np.empty(0, dtype=np.int32)
+        self._targets = np.concatenate(targets) if targets else np.empty(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self._targets)
+
+    def targets(self, name=None):
+        """Target start index of every sample, optionally for one name only"""
+        if name is None:
+            return self._targets
+        return self._targets[self._ids == self.names.index(name)]
+
+    def take(self, indices):
+        """
+        Gather samples into (X [n, time_step, 1], y [n, horizon]) float32 arrays.
+        Only these samples are copied; samples may mix names.
+        """
+        indices = np.asarray(indices)
+        X = np.empty((len(indices), self.time_step, 1), dtype=np.float32)
+        y = np.empty((len(indices), self.horizon), dtype=np.float32)
+
+        ids = self._ids[indices]
+        for i in np.unique(ids):
+            mask = ids == i
+            rows = self._views[i][self._targets[indices[mask]] - self.time_step]
+            X[mask, :, 0] = rows[:, :self.time_step]
+            y[mask] = rows[:, self.time_step:]
+        return X, y
+
+    def batches(self, batch_size=32, shuffle=False, seed=None):
+        """Yield (X, y) batches; shuffling mixes samples across every name"""
+        order = np.arange(len(self))
+        if shuffle:
+            np.random.default_rng(seed).shuffle(order)
+        for start in range(0, len(order), batch_size):
+            yield self.take(order[start:start + batch_size])
+
+    def to_tf_dataset(self, batch_size=32, shuffle=False, seed=None):
+        """tf.data pipeline over `batches`; reshuffled on every epoch when shuffle is set"""
+        import tensorflow as tf
+
+        epoch = [0]
+
+        def generate():
+            epoch[0] += 1
+            epoch_seed = None if seed is None else seed + epoch[0]
+            for X, y in self.batches(batch_size, shuffle, epoch_seed):
+                yield X, (y[:, 0] if self.horizon == 1 else y)
+
+        target_shape = (None,) if self.horizon == 1 else (None, self.horizon)
+        signature = (
+            tf.TensorSpec((None, self.time_step, 1), tf.float32),
+            tf.TensorSpec(target_shape, tf.float32),
+        )
+        return tf.data.Dataset.from_generator(generate, output_signature=signature).prefetch(tf.data.AUTOTUNE)
@@ -0,0 +1,41 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+
+#----------------------------------------
+# CPU-Pinned Process Pool
+#----------------------------------------
+
+def cpu_slices(workers):
+    """Split the CPUs this process may use into one disjoint set per worker"""
+    cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else list(range(os.cpu_count() or 1))
+    workers = max(1, min(workers, len(cpus)))
+    return [cpus[i::workers] for i in range(workers)]
+
+
+def _init_worker(cpu_queue, configure_tensorflow):
+    """Pin a worker process to its own CPUs; TensorFlow's thread pools are sized to match"""
+    cpus = cpu_queue.get()
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cpus)
+
+    if configure_tensorflow:
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(len(cpus))
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def pinned_process_pool(workers, configure_tensorflow=True):
+    """
+    ProcessPoolExecutor with one worker per disjoint CPU slice (at most one
+    per CPU). Workers are spawned fresh, since TensorFlow is not fork-safe.
+    """
+    context = get_context('spawn')
+    slices = cpu_slices(workers)
+    cpu_queue = context.Queue()
+    for cpus in slices:
+        cpu_queue.put(cpus)
+
+    return ProcessPoolExecutor(max_workers=len(slices), mp_context=context, initializer=_init_worker,
+                               initargs=(cpu_queue, configure_tensorflow))
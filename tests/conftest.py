@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.storage import PRICE_DTYPES
+
+
+def price_frame(rows, start='2024-01-01', seed=0):
+    """Merged-frame shaped prices: a 'Date' column and the OHLCV columns"""
+    rng = np.random.default_rng(seed)
+    close = 100.0 + np.cumsum(rng.normal(0, 1, rows))
+    df = pd.DataFrame({
+        'Date': pd.bdate_range(start, periods=rows),
+        'Open': close + rng.normal(0, 0.5, rows),
+        'High': close + 1.0,
+        'Low': close - 1.0,
+        'Close': close,
+        'Volume': rng.integers(1_000_000, 2_000_000, rows),
+    })
+    return df.astype(PRICE_DTYPES)
+
+
+class FakeStore:
+    """Stands in for the merged frame cache: set `frame`, and each change gets a new source signature"""
+
+    def __init__(self):
+        self.frame = None
+        self.version = 0
+
+    def set(self, frame):
+        self.frame = frame
+        self.version += 1
+
+    def signature(self, ticker, store_dir=None):
+        return (('fake', self.version),)
+
+    def combined(self, ticker):
+        return None if self.frame is None else self.frame.copy(deep=False)
+
+
+@pytest.fixture
+def make_prices():
+    return price_frame
+
+
+@pytest.fixture
+def fake_store(monkeypatch):
+    from src import frame_cache
+
+    store = FakeStore()
+    monkeypatch.setattr(frame_cache, 'source_signature', store.signature)
+    monkeypatch.setattr(frame_cache, 'get_combined_frame', store.combined)
+    return store
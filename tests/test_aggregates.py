@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from src import aggregates, features
+
+
+def test_corrected_bar_refreshes_period_stats(fake_store, make_prices, monkeypatch):
+    monkeypatch.setattr(features, '_feature_frames', {})
+    monkeypatch.setattr(aggregates, '_indexes', {})
+    prices = make_prices(120)
+    fake_store.set(prices)
+    year = int(prices['Date'].dt.year.iloc[0])
+    before = aggregates.get_period_index('TEST').month_stats(year, 1)
+
+    # Same dates and row count, January's highest bar corrected
+    corrected = prices.copy()
+    corrected.loc[5, 'High'] = np.float32(before['highest_price'] + 50)
+    fake_store.set(corrected)
+    after = aggregates.get_period_index('TEST').month_stats(year, 1)
+    assert after['highest_price'] == pytest.approx(before['highest_price'] + 50)
+
+
+def test_appended_bars_extend_the_index(fake_store, make_prices, monkeypatch):
+    monkeypatch.setattr(features, '_feature_frames', {})
+    monkeypatch.setattr(aggregates, '_indexes', {})
+    prices = make_prices(130)
+    fake_store.set(prices.iloc[:120])
+    aggregates.get_period_index('TEST')
+
+    fake_store.set(prices)
+    index = aggregates.get_period_index('TEST')
+    expected = aggregates.PeriodIndex(features.compute_features(prices))
+    assert index.years() == expected.years()
+    assert index.history_stats() == expected.history_stats()
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from src import batch_forecast as bf
+
+
+class _Scaler:
+    def inverse_transform(self, values):
+        return np.asarray(values) * 100.0
+
+
+def test_failing_group_does_not_discard_the_batch(monkeypatch):
+    def prepare(ticker):
+        return {
+            'model': ticker,
+            'x_input': np.zeros((1, 60, 1), dtype=np.float32),
+            'scaler': _Scaler(),
+            'last_date': pd.Timestamp('2025-01-02'),
+            'last_price': 100.0,
+        }
+
+    def forecast_group(models, windows, days=7):
+        if 'BAD' in models:
+            raise ValueError("corrupt weights")
+        return np.ones((len(models), days), dtype=np.float32)
+
+    monkeypatch.setattr(bf, '_prepare_ticker', prepare)
+    monkeypatch.setattr(bf, 'group_by_architecture', lambda models: [['AAPL', 'MSFT'], ['BAD'], ['TSLA']])
+    monkeypatch.setattr(bf, 'forecast_group', forecast_group)
+
+    results = bf.batch_forecast(['AAPL', 'MSFT', 'BAD', 'TSLA'], days=3, max_workers=2)
+
+    assert results['BAD'] == {'ticker': 'BAD', 'error': 'corrupt weights'}
+    for ticker in ('AAPL', 'MSFT', 'TSLA'):
+        assert results[ticker]['predicted_prices'] == [100.0, 100.0, 100.0]
@@ -0,0 +1,19 @@
+import numpy as np
+
+from src import chart_data, features
+
+
+def test_corrected_history_refreshes_chart(fake_store, make_prices, monkeypatch):
+    monkeypatch.setattr(features, '_feature_frames', {})
+    monkeypatch.setattr(chart_data, '_chart_frames', {})
+    prices = make_prices(300)
+    fake_store.set(prices)
+    chart_data.chart_frame('TEST', 'all', max_points=100)
+
+    # Same row count and last date, an early close corrected
+    corrected = prices.copy()
+    corrected.loc[0, 'Close'] = np.float32(1000.0)
+    fake_store.set(corrected)
+    frame = chart_data.chart_frame('TEST', 'all', max_points=100)
+    assert len(frame) <= 100
+    assert frame['Close'].iloc[0] == 1000.0
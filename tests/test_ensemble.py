@@ -0,0 +1,28 @@
+import pytest
+
+from src.ensemble import MIN_MEMBERS, validate_members
+from src.model_registry import MODEL_DIR
+
+pytest.importorskip('tensorflow')
+
+ROUGH_DIR = 'rough/model'
+
+
+@pytest.mark.parametrize('ticker', ['AAPL', 'AMZN', 'GOOGL', 'META', 'TSLA'])
+def test_shipped_sets_form_an_ensemble(ticker):
+    members, rejected = validate_members(ticker, [MODEL_DIR, ROUGH_DIR])
+    assert members == [MODEL_DIR, ROUGH_DIR] and not rejected
+
+
+def test_copied_rough_model_is_rejected():
+    members, rejected = validate_members('MSFT', [MODEL_DIR, ROUGH_DIR])
+    assert members == [MODEL_DIR]
+    assert [model_dir for model_dir, _ in rejected] == [ROUGH_DIR]
+
+
+def test_backend_refuses_a_single_member():
+    from src.ensemble import EnsembleBackend
+
+    assert len(validate_members('MSFT', [MODEL_DIR, ROUGH_DIR])[0]) < MIN_MEMBERS
+    with pytest.raises(ValueError):
+        EnsembleBackend('MSFT', [MODEL_DIR, ROUGH_DIR])
@@ -0,0 +1,32 @@
+import numpy as np
+
+from src import features
+
+
+def _assert_matches_full_recompute(frame, prices):
+    expected = features.compute_features(prices)
+    for column in features.INDICATOR_FEATURES:
+        np.testing.assert_allclose(frame[column].to_numpy(), expected[column].to_numpy(), rtol=1e-6, equal_nan=True)
+
+
+def test_corrected_bar_recomputes_features(fake_store, make_prices, monkeypatch):
+    monkeypatch.setattr(features, '_feature_frames', {})
+    prices = make_prices(120)
+    fake_store.set(prices)
+    features.get_feature_frame('TEST')
+
+    # Same dates and row count, one corrected close
+    corrected = prices.copy()
+    corrected.loc[60, 'Close'] = np.float32(corrected.loc[60, 'Close'] * 1.5)
+    fake_store.set(corrected)
+    _assert_matches_full_recompute(features.get_feature_frame('TEST'), corrected)
+
+
+def test_appended_bars_extend_features(fake_store, make_prices, monkeypatch):
+    monkeypatch.setattr(features, '_feature_frames', {})
+    prices = make_prices(130)
+    fake_store.set(prices.iloc[:120])
+    features.get_feature_frame('TEST')
+
+    fake_store.set(prices)
+    _assert_matches_full_recompute(features.get_feature_frame('TEST'), prices)
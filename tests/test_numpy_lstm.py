@@ -0,0 +1,27 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.model_registry import MODEL_DIR, model_path_for
+from src.numpy_lstm import MAX_WORKSPACES, NumpyLSTMModel, check_parity
+from src.storage import TICKERS
+
+pytest.importorskip('tensorflow')
+
+SHIPPED = [ticker for ticker in TICKERS if os.path.exists(model_path_for(ticker, MODEL_DIR))]
+
+
+@pytest.mark.parametrize('ticker', SHIPPED)
+def test_seven_day_parity_with_keras(ticker):
+    ok, max_diff = check_parity(ticker, days=7, tolerance=1e-3)
+    assert ok, f"{ticker}: NumPy and Keras forecasts differ by {max_diff:.2e} USD"
+
+
+@pytest.mark.skipif(not SHIPPED, reason="no shipped models")
+def test_workspaces_are_capped():
+    model = NumpyLSTMModel.from_h5(model_path_for(SHIPPED[0], MODEL_DIR))
+    for batch in range(1, MAX_WORKSPACES + 4):
+        model.predict(np.zeros((batch, 8, 1), dtype=np.float32))
+    assert len(model._workspaces) == MAX_WORKSPACES
+    assert (MAX_WORKSPACES + 3, 8) in model._workspaces
@@ -0,0 +1,78 @@
+import shutil
+
+from src import download_data, refresh
+from src.preprocess import read_price_csv
+from src.providers import LocalFileProvider
+
+SOURCE = 'data/AAPL_clean.csv'
+
+
+class FakeClock:
+    """Stands in for the time module: sleeping only advances the clock"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    perf_counter = monotonic
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FlakyProvider:
+    """Fails the first `failures` fetches, then serves bars from `provider`"""
+    name = 'flaky'
+
+    def __init__(self, provider, failures):
+        self.provider = provider
+        self.failures = failures
+        self.calls = 0
+
+    def fetch(self, ticker, start, end, interval='1d'):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("provider unavailable")
+        return self.provider.fetch(ticker, start, end, interval)
+
+
+def test_refresh_retries_with_backoff(tmp_path, monkeypatch):
+    shutil.copy(SOURCE, tmp_path / 'TEST.csv')
+    bars = read_price_csv(SOURCE)
+    clock = FakeClock()
+    monkeypatch.setattr(refresh, 'time', clock)
+    monkeypatch.setattr(download_data, 'last_completed_trading_day', lambda: bars['Date'].iloc[-1].date())
+    provider = FlakyProvider(LocalFileProvider(str(tmp_path)), failures=2)
+
+    [row] = refresh.refresh_tickers(['TEST'], provider, rate_limit=0, retries=3, backoff=1.0,
+                                    store_dir=str(tmp_path / 'store'))
+
+    assert row['ok'] and row['attempts'] == 3 and provider.calls == 3
+    assert row['rows_added'] == len(bars[bars['Date'] >= download_data.DEFAULT_START_DATE])
+    assert clock.sleeps == [1.0, 2.0]
+
+
+def test_refresh_gives_up_after_the_retries(tmp_path, monkeypatch):
+    monkeypatch.setattr(refresh, 'time', FakeClock())
+    provider = FlakyProvider(None, failures=10)
+
+    [row] = refresh.refresh_tickers(['TEST'], provider, rate_limit=0, retries=2, store_dir=str(tmp_path))
+
+    assert not row['ok'] and row['attempts'] == 3 and provider.calls == 3
+
+
+def test_rate_limiter_spaces_calls(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(refresh, 'time', clock)
+    limiter = refresh.RateLimiter(rate=4)
+
+    times = []
+    for _ in range(5):
+        limiter.wait()
+        times.append(clock.now)
+
+    assert times == [0.0, 0.25, 0.5, 0.75, 1.0]
@@ -0,0 +1,50 @@
+import threading
+import time
+
+import numpy as np
+
+from src import scheduler
+
+
+class StubBackend:
+    """Forecasts each window's last value + day index, slowly enough for requests to queue"""
+
+    def __init__(self):
+        self.batch_sizes = []
+        self._lock = threading.Lock()
+
+    def forecast_scaled(self, windows, days=7):
+        with self._lock:
+            self.batch_sizes.append(len(windows))
+        time.sleep(0.002)
+        return windows[:, -1, 0][:, None] + np.arange(days, dtype=np.float32)
+
+
+def test_concurrent_requests_are_batched(monkeypatch):
+    backend = StubBackend()
+    monkeypatch.setattr(scheduler, 'get_backend', lambda ticker, name=None: backend)
+    windows = np.arange(128, dtype=np.float32)[:, None, None] * np.ones((1, 60, 1), dtype=np.float32)
+
+    results = {}
+    lock = threading.Lock()
+    inference = scheduler.InferenceScheduler('stub', max_batch_size=16, max_wait_ms=20)
+
+    def forecast(window):
+        output = inference.forecast_scaled('TEST', window, days=3)
+        with lock:
+            results[int(window[-1, 0])] = output
+
+    try:
+        scheduler.run_load(forecast, windows, clients=32)
+        stats = inference.stats()['TEST:3']
+    finally:
+        inference.close()
+
+    # Every caller got the forecast of its own window
+    assert sorted(results) == list(range(128))
+    for value, output in results.items():
+        np.testing.assert_array_equal(output, value + np.arange(3, dtype=np.float32))
+
+    assert stats['items'] == 128
+    assert stats['mean_batch_size'] > 1
+    assert max(backend.batch_sizes) <= 16
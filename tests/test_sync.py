@@ -0,0 +1,29 @@
+import shutil
+
+from src import download_data
+from src.preprocess import read_price_csv
+from src.providers import LocalFileProvider
+from src.storage import append_prices, read_prices
+
+SOURCE = 'data/AAPL_clean.csv'
+
+
+def test_sync_appends_only_new_bars(tmp_path, monkeypatch):
+    source_dir = tmp_path / 'source'
+    source_dir.mkdir()
+    shutil.copy(SOURCE, source_dir / 'TEST.csv')
+    bars = read_price_csv(SOURCE)
+    store_dir = str(tmp_path / 'store')
+
+    # The store already holds all but the last 10 bars
+    append_prices('TEST', bars.iloc[:-10], 'recent', store_dir)
+    monkeypatch.setattr(download_data, 'last_completed_trading_day', lambda: bars['Date'].iloc[-1].date())
+    provider = LocalFileProvider(str(source_dir))
+
+    assert download_data.sync_ticker('TEST', provider=provider, store_dir=store_dir) == 10
+    stored = read_prices('TEST', 'recent', store_dir)
+    assert len(stored) == len(bars)
+    assert stored.index.max() == bars['Date'].iloc[-1]
+
+    assert download_data.sync_ticker('TEST', provider=provider, store_dir=store_dir) == 0
+    assert len(read_prices('TEST', 'recent', store_dir)) == len(bars)